@@ -3,14 +3,37 @@ Atlan Customer Copilot AI Pipeline
 
 This package contains the AI components for classifying customer support tickets,
 including sentiment analysis, topic classification, and priority assignment.
+
+Components are loaded lazily (PEP 562): importing the package is cheap, and each
+submodule - with its LLM, HTTP and document-parsing dependencies - is only
+imported the first time one of its names is accessed.
 """
 
-from .sentiment_agent import SentimentAgent, ClassificationResult, TopicTag, Sentiment, Priority
+import importlib
+
+# Public name -> submodule that defines it
+_LAZY = {
+    'SentimentAgent': 'sentiment_agent',
+    'ClassificationResult': 'sentiment_agent',
+    'TopicTag': 'sentiment_agent',
+    'Sentiment': 'sentiment_agent',
+    'Priority': 'sentiment_agent',
+    'get_simple_tavily_system': 'simple_tavily_system',
+    'SimpleTavilySystem': 'simple_tavily_system',
+    'TavilyRAGIntegration': 'tavily_rag_integration',
+    'FileParser': 'file_parser',
+}
+
+__all__ = list(_LAZY)
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_LAZY[name]}", __name__)
+    value = getattr(module, name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
 
-__all__ = [
-    'SentimentAgent',
-    'ClassificationResult',
-    'TopicTag',
-    'Sentiment',
-    'Priority'
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
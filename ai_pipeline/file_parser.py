@@ -9,7 +9,8 @@ import json
 import csv
 import io
 import hashlib
-from typing import Dict, List, Any, Optional, Union
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Union, BinaryIO
 from pathlib import Path
 from datetime import datetime
 import PyPDF2
@@ -19,6 +20,15 @@ from docx import Document
 from bs4 import BeautifulSoup
 import re
 
+@contextmanager
+def _text_stream(stream: BinaryIO, encoding: str = 'utf-8', newline: Optional[str] = None):
+    """Decode a binary stream lazily without closing it afterwards"""
+    text = io.TextIOWrapper(stream, encoding=encoding, newline=newline)
+    try:
+        yield text
+    finally:
+        text.detach()
+
 class FileParser:
     """Universal file parser for various document formats"""
     
@@ -39,13 +49,13 @@ class FileParser:
             '.yml': self._parse_yaml
         }
     
-    def parse_file(self, file_path: str, file_content: bytes = None) -> Dict[str, Any]:
+    def parse_file(self, file_path: str, file_content: Union[bytes, BinaryIO] = None) -> Dict[str, Any]:
         """
         Parse a file and extract its content
         
         Args:
             file_path: Path to the file or filename for content
-            file_content: Raw file content as bytes (optional)
+            file_content: Raw file content as bytes or a binary file-like object (optional)
         
         Returns:
             Dictionary with parsed content and metadata
@@ -61,14 +71,18 @@ class FileParser:
                     'supported_formats': list(self.supported_formats.keys())
                 }
             
-            # Parse the file
-            if file_content:
-                # Parse from bytes
-                content = self.supported_formats[file_ext](file_content)
-            else:
+            # Parse the file - parsers read from a binary stream so file-like
+            # uploads are consumed in place instead of being copied to bytes first
+            if file_content is None:
                 # Parse from file path
                 with open(file_path, 'rb') as f:
-                    content = self.supported_formats[file_ext](f.read())
+                    content = self.supported_formats[file_ext](f)
+            elif isinstance(file_content, (bytes, bytearray)):
+                # Parse from bytes
+                content = self.supported_formats[file_ext](io.BytesIO(file_content))
+            else:
+                # Parse from file-like object
+                content = self.supported_formats[file_ext](file_content)
             
             return {
                 'success': True,
@@ -86,43 +100,39 @@ class FileParser:
                 'file_type': file_ext if 'file_ext' in locals() else 'unknown'
             }
     
-    def _parse_pdf(self, content: bytes) -> str:
+    def _parse_pdf(self, stream: BinaryIO) -> str:
         """Parse PDF content"""
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-            text = ""
+            pdf_reader = PyPDF2.PdfReader(stream)
             
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
+            # Collect lines and join once instead of re-allocating the string per page
+            lines = [page.extract_text() for page in pdf_reader.pages]
             
-            return text.strip()
+            return "\n".join(lines).strip()
         except Exception as e:
             raise Exception(f"PDF parsing error: {str(e)}")
     
-    def _parse_docx(self, content: bytes) -> str:
+    def _parse_docx(self, stream: BinaryIO) -> str:
         """Parse DOCX content"""
         try:
-            doc = Document(io.BytesIO(content))
-            text = ""
-            
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+            doc = Document(stream)
+            lines = [paragraph.text for paragraph in doc.paragraphs]
             
             # Also extract text from tables
             for table in doc.tables:
                 for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
+                    lines.append("".join(cell.text + " " for cell in row.cells))
             
-            return text.strip()
+            return "\n".join(lines).strip()
         except Exception as e:
             raise Exception(f"DOCX parsing error: {str(e)}")
     
-    def _parse_txt(self, content: bytes) -> str:
+    def _parse_txt(self, stream: BinaryIO) -> str:
         """Parse plain text content"""
         try:
+            # Encoding detection needs the raw bytes
+            content = stream.read()
+            
             # Try different encodings
             encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
             
@@ -137,25 +147,20 @@ class FileParser:
         except Exception as e:
             raise Exception(f"Text parsing error: {str(e)}")
     
-    def _parse_csv(self, content: bytes) -> str:
+    def _parse_csv(self, stream: BinaryIO) -> str:
         """Parse CSV content"""
         try:
-            text_content = content.decode('utf-8')
-            csv_reader = csv.reader(io.StringIO(text_content))
-            
-            # Convert CSV to readable text
-            lines = []
-            for row in csv_reader:
-                lines.append(" | ".join(row))
-            
-            return "\n".join(lines)
+            # Decode and split rows lazily while converting CSV to readable text
+            with _text_stream(stream, newline='') as text:
+                return "\n".join(" | ".join(row) for row in csv.reader(text))
         except Exception as e:
             raise Exception(f"CSV parsing error: {str(e)}")
     
-    def _parse_json(self, content: bytes) -> str:
+    def _parse_json(self, stream: BinaryIO) -> str:
         """Parse JSON content"""
         try:
-            json_data = json.loads(content.decode('utf-8'))
+            with _text_stream(stream) as text:
+                json_data = json.load(text)
             
             # Convert JSON to readable text
             if isinstance(json_data, dict):
@@ -167,10 +172,11 @@ class FileParser:
         except Exception as e:
             raise Exception(f"JSON parsing error: {str(e)}")
     
-    def _parse_html(self, content: bytes) -> str:
+    def _parse_html(self, stream: BinaryIO) -> str:
         """Parse HTML content"""
         try:
-            soup = BeautifulSoup(content.decode('utf-8'), 'html.parser')
+            with _text_stream(stream) as text:
+                soup = BeautifulSoup(text, 'html.parser')
             
             # Remove script and style elements
             for script in soup(["script", "style"]):
@@ -188,10 +194,11 @@ class FileParser:
         except Exception as e:
             raise Exception(f"HTML parsing error: {str(e)}")
     
-    def _parse_markdown(self, content: bytes) -> str:
+    def _parse_markdown(self, stream: BinaryIO) -> str:
         """Parse Markdown content"""
         try:
-            text = content.decode('utf-8')
+            with _text_stream(stream) as text_stream:
+                text = text_stream.read()
             # Basic markdown cleaning - remove markdown syntax
             text = re.sub(r'#{1,6}\s+', '', text)  # Remove headers
             text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Remove bold
@@ -202,26 +209,30 @@ class FileParser:
         except Exception as e:
             raise Exception(f"Markdown parsing error: {str(e)}")
     
-    def _parse_log(self, content: bytes) -> str:
+    def _parse_log(self, stream: BinaryIO) -> str:
         """Parse log file content"""
         try:
-            return content.decode('utf-8')
+            # Decode line by line rather than materializing the raw bytes first
+            with _text_stream(stream) as text:
+                return "".join(text)
         except Exception as e:
             raise Exception(f"Log parsing error: {str(e)}")
     
-    def _parse_xml(self, content: bytes) -> str:
+    def _parse_xml(self, stream: BinaryIO) -> str:
         """Parse XML content"""
         try:
-            soup = BeautifulSoup(content.decode('utf-8'), 'xml')
+            with _text_stream(stream) as text:
+                soup = BeautifulSoup(text, 'xml')
             return soup.get_text()
         except Exception as e:
             raise Exception(f"XML parsing error: {str(e)}")
     
-    def _parse_yaml(self, content: bytes) -> str:
+    def _parse_yaml(self, stream: BinaryIO) -> str:
         """Parse YAML content"""
         try:
             import yaml
-            yaml_data = yaml.safe_load(content.decode('utf-8'))
+            with _text_stream(stream) as text:
+                yaml_data = yaml.safe_load(text)
             
             if isinstance(yaml_data, dict):
                 return self._dict_to_text(yaml_data)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Semantic Query Cache
+Reuses results for repeated or near-identical queries to skip the LLM + Tavily round trips
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+class SemanticCache:
+    """
+    Query result cache with an exact-match fast path and an embedding similarity lookup.
+    The similarity lookup needs sentence-transformers; without it the cache is exact-match only.
+    """
+
+    def __init__(self, ttl: float = 300, threshold: float = 0.85, max_entries: int = 256,
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._exact: Dict[str, Dict[str, Any]] = {}
+        self._entries: List[Dict[str, Any]] = []
+        self._vectors = None
+
+        # Embedding model is optional - fall back to exact matching if it is not installed
+        self._model = None
+        try:
+            import numpy as np
+            from sentence_transformers import SentenceTransformer
+            self._np = np
+            self._model = SentenceTransformer(model_name)
+            print("✅ Semantic cache initialized with embedding lookup")
+        except Exception as e:
+            print(f"⚠️ Semantic cache using exact-match only: {e}")
+
+    @staticmethod
+    def _key(query: str) -> str:
+        """Exact-match key for a normalized query"""
+        return hashlib.sha1(query.strip().lower().encode()).hexdigest()
+
+    def _embed(self, query: str):
+        """Normalized embedding so the dot product is the cosine similarity"""
+        return self._model.encode([query.strip()], normalize_embeddings=True)[0].astype(self._np.float32)
+
+    def lookup(self, query: str) -> Optional[Any]:
+        """Return the cached value for this query or a similar one, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._exact.get(self._key(query))
+            if entry and now - entry['ts'] < self.ttl:
+                return entry['value']
+
+            if self._model is None or not self._entries:
+                return None
+
+        # Embed outside the lock so concurrent lookups don't serialize on the model
+        vector = self._embed(query)
+        with self._lock:
+            if not self._entries:
+                return None
+
+            scores = self._vectors @ vector
+            # Expired rows can't win the argmax and hide a fresh match below them
+            fresh = self._np.fromiter((now - entry['ts'] < self.ttl for entry in self._entries),
+                                      dtype=bool, count=len(self._entries))
+            scores = self._np.where(fresh, scores, -self._np.inf)
+            best = int(scores.argmax())
+            if scores[best] >= self.threshold:
+                return self._entries[best]['value']
+
+        return None
+
+    def store(self, query: str, value: Any):
+        """Cache a value for this query"""
+        entry = {'key': self._key(query), 'query': query, 'value': value, 'ts': time.time()}
+        vector = self._embed(query) if self._model is not None else None
+
+        with self._lock:
+            # Re-insert at the end so _prune's oldest-first eviction sees the refresh
+            self._exact.pop(entry['key'], None)
+            self._exact[entry['key']] = entry
+            if vector is not None:
+                self._entries.append(entry)
+                self._vectors = vector[None, :] if self._vectors is None else self._np.vstack([self._vectors, vector])
+            self._prune()
+
+    def _prune(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        cutoff = time.time() - self.ttl
+        for key in [key for key, entry in self._exact.items() if entry['ts'] < cutoff]:
+            del self._exact[key]
+        while len(self._exact) > self.max_entries:
+            del self._exact[next(iter(self._exact))]
+
+        if self._entries:
+            keep = [i for i, entry in enumerate(self._entries) if self._exact.get(entry['key']) is entry]
+            if len(keep) != len(self._entries):
+                self._entries = [self._entries[i] for i in keep]
+                self._vectors = self._vectors[keep] if keep else None
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._exact.clear()
+            self._entries = []
+            self._vectors = None
@@ -3,8 +3,8 @@ AI-powered ticket classification system for customer support.
 Classifies tickets by topic, sentiment, and priority using Claude AI models.
 """
 
-import json
 import re
+import orjson
 import hashlib
 from typing import Dict, List, Tuple
 from dataclasses import dataclass
@@ -52,21 +52,24 @@ class SentimentAgent:
     def __init__(self):
         # Use the provided Grok API key from environment
         self.api_key = os.getenv("GROK_API_KEY", "").strip()
-        print(f"🔍 SentimentAgent - GROK_API_KEY present: {bool(self.api_key)}")
-        if self.api_key:
-            print(f"🔍 SentimentAgent - GROK_API_KEY starts with: {self.api_key[:10]}...")
+        # Debug-only logging - compiled out under python -O / PYTHONOPTIMIZE=1
+        if __debug__:
+            print(f"🔍 SentimentAgent - GROK_API_KEY present: {bool(self.api_key)}")
+            if self.api_key:
+                print(f"🔍 SentimentAgent - GROK_API_KEY starts with: {self.api_key[:10]}...")
         
         if not self.api_key:
             raise ValueError("GROK_API_KEY environment variable is required")
         
-        print(f"🔍 SentimentAgent - Initializing Grok client with key: {self.api_key[:10]}...")
-        print(f"🔍 SentimentAgent - Full API key length: {len(self.api_key)}")
-        print(f"🔍 SentimentAgent - API key starts with: {self.api_key[:20]}...")
-        print(f"🔍 SentimentAgent - API key ends with: ...{self.api_key[-10:]}")
-        newline_char = '\n'
-        carriage_return_char = '\r'
-        print(f"🔍 SentimentAgent - API key has newline: {newline_char in self.api_key}")
-        print(f"🔍 SentimentAgent - API key has carriage return: {carriage_return_char in self.api_key}")
+        if __debug__:
+            print(f"🔍 SentimentAgent - Initializing Grok client with key: {self.api_key[:10]}...")
+            print(f"🔍 SentimentAgent - Full API key length: {len(self.api_key)}")
+            print(f"🔍 SentimentAgent - API key starts with: {self.api_key[:20]}...")
+            print(f"🔍 SentimentAgent - API key ends with: ...{self.api_key[-10:]}")
+            newline_char = '\n'
+            carriage_return_char = '\r'
+            print(f"🔍 SentimentAgent - API key has newline: {newline_char in self.api_key}")
+            print(f"🔍 SentimentAgent - API key has carriage return: {carriage_return_char in self.api_key}")
         
         # Initialize Grok client with Railway-compatible settings
         try:
@@ -87,6 +90,10 @@ class SentimentAgent:
             print("✅ Grok client initialized with httpx fallback")
         
         self.model = os.getenv("GROK_MODEL", "gemma2-9b-it")
+        
+        # Persistent HTTP session so repeated LLM calls reuse the TLS connection
+        self.http = requests.Session()
+        self.http.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
         self.temperature = float(os.getenv("GROK_TEMPERATURE", "0.1"))
         self.max_tokens = int(os.getenv("GROK_MAX_TOKENS", "1000"))
         
@@ -474,7 +481,6 @@ class SentimentAgent:
         
         import time
         import random
-        import requests
         max_retries = 3
         base_delay = 1
         
@@ -496,10 +502,10 @@ class SentimentAgent:
                     "temperature": self.temperature
                 }
                 
-                response = requests.post(url, headers=headers, json=data, timeout=30)
+                response = self.http.post(url, headers=headers, json=data, timeout=30)
                 response.raise_for_status()
                 
-                result = response.json()["choices"][0]["message"]["content"]
+                result = orjson.loads(response.content)["choices"][0]["message"]["content"]
                 # Cache the successful response
                 self._cache_response(cache_key, result)
                 return result
@@ -576,7 +582,7 @@ class SentimentAgent:
             cleaned_response = re.sub(r'\s*"', '"', cleaned_response)
             
             # Try to parse the cleaned JSON
-            parsed = json.loads(cleaned_response)
+            parsed = orjson.loads(cleaned_response)
             
             # Clean up any keys that might still have whitespace issues
             if isinstance(parsed, dict):
@@ -589,7 +595,7 @@ class SentimentAgent:
             
             return parsed
             
-        except (json.JSONDecodeError, Exception) as e:
+        except (orjson.JSONDecodeError, Exception) as e:
             print(f"Failed to parse JSON response: {response}")
             print(f"Cleaned response: {cleaned_response if 'cleaned_response' in locals() else 'N/A'}")
             print(f"Error: {e}")
@@ -6,17 +6,63 @@ Uses only Tavily for real-time documentation search
 
 import asyncio
 import os
-from typing import List, Dict, Any, Optional
+import functools
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Union
 from dataclasses import dataclass
+from diskcache import Cache
 from dotenv import load_dotenv
-import sys
-sys.path.append('ai_pipeline')
 
-from sentiment_agent import SentimentAgent
-from tavily_rag_integration import TavilyRAGIntegration
+from .sentiment_agent import SentimentAgent
+from .tavily_rag_integration import TavilyRAGIntegration
+from tavily_config import PERFORMANCE_CONFIG
 
 load_dotenv()
 
+# Persistent cache of query results, shared across processes and restarts.
+# Bump QUERY_CACHE_VERSION when the analysis or response format (or module path) changes.
+QUERY_CACHE_VERSION = "v2"
+# Anchored at the project root rather than the cwd; QUERY_CACHE_DIR overrides it
+QUERY_CACHE_DIR = os.getenv("QUERY_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "queries"
+)
+
+@functools.lru_cache(maxsize=None)
+def get_query_cache() -> Cache:
+    """The persistent query cache, opened on first use"""
+    return Cache(QUERY_CACHE_DIR)
+
+async def query_cache_get(key: str):
+    """Read a query cache entry without blocking the event loop on SQLite"""
+    return await asyncio.to_thread(lambda: get_query_cache().get(key))
+
+async def query_cache_set(key: str, value, ttl: float):
+    """Write a query cache entry without blocking the event loop on SQLite"""
+    await asyncio.to_thread(lambda: get_query_cache().set(key, value, expire=ttl))
+
+def query_cache_key(name: str, ticket_text: str) -> str:
+    """Disk cache key for a method's result on the normalized ticket text"""
+    digest = hashlib.sha1(f"{ticket_text.strip().lower()}|{QUERY_CACHE_VERSION}".encode()).hexdigest()
+    return f"{name}:{digest}"
+
+def async_diskcache(ttl: float, should_cache=None):
+    """Cache an async method's result in the query cache, keyed on its normalized ticket text"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, ticket_text: str):
+            key = query_cache_key(func.__name__, ticket_text)
+            
+            cached = await query_cache_get(key)
+            if cached is not None:
+                return cached
+            
+            result = await func(self, ticket_text)
+            if should_cache is None or should_cache(result):
+                await query_cache_set(key, result, ttl)
+            return result
+        return wrapper
+    return decorator
+
 @dataclass
 class TicketAnalysis:
     """Internal analysis of a ticket"""
@@ -92,12 +138,14 @@ class SimpleTavilySystem:
             # Don't raise the exception - allow the app to start with limited functionality
             self.initialized = False
     
+    @async_diskcache(ttl=PERFORMANCE_CONFIG['cache_duration'])
     async def analyze_ticket(self, ticket_text: str) -> TicketAnalysis:
         """Analyze ticket using sentiment agent (internal analysis)"""
         if not self.sentiment_agent:
             raise Exception("Sentiment agent not initialized")
         
-        classification = self.sentiment_agent.classify_ticket("", ticket_text)
+        # The Groq call blocks (requests with sleep-based retries) - keep it off the event loop
+        classification = await asyncio.to_thread(self.sentiment_agent.classify_ticket, "", ticket_text)
         
         return TicketAnalysis(
             topic_tags=[tag.value for tag in classification.topic_tags],
@@ -109,75 +157,152 @@ class SimpleTavilySystem:
     
     async def process_ticket(self, ticket_text: str) -> TavilyResponse:
         """Process ticket with Tavily-only pipeline"""
+        _, response = await self.process_and_analyze(ticket_text)
+        return response
+    
+    @async_diskcache(ttl=PERFORMANCE_CONFIG['cache_duration'],
+                     should_cache=lambda result: result[1].confidence > 0)
+    async def process_and_analyze(self, ticket_text: str) -> Tuple[TicketAnalysis, TavilyResponse]:
+        """Process ticket and return both the internal analysis and the final response from a single classification pass"""
         if not self.initialized:
             await self.initialize()
         
         # Step 1: Internal Analysis (using sentiment agent)
         analysis = await self.analyze_ticket(ticket_text)
+        response = await self._respond(ticket_text, analysis)
+        return analysis, response
+    
+    async def process_ticket_stream(self, ticket_text: str) -> AsyncIterator[Union[str, Tuple[TicketAnalysis, TavilyResponse]]]:
+        """
+        Process ticket, streaming the answer text as it is generated.
+        Yields answer chunks, then a final (analysis, response) tuple for source attribution.
+        Cached results, routed tickets and empty searches yield only the final tuple.
+        """
+        if not self.initialized:
+            await self.initialize()
         
-        # Step 2: Determine if we should use Tavily or route to team
-        # STRICT RULE: Only use Tavily for specific topics
-        tavily_topics = {"How-to", "Product", "Best practices", "API/SDK", "SSO"}
-        should_use_tavily = any(tag in tavily_topics for tag in analysis.topic_tags)
+        cache_key = query_cache_key("process_and_analyze", ticket_text)
+        cached = await query_cache_get(cache_key)
+        if cached is not None:
+            yield cached
+            return
         
-        if should_use_tavily:
-            # Use Tavily for real-time documentation search
-            print(f"🔍 Using Tavily for topics: {[tag for tag in analysis.topic_tags if tag in tavily_topics]}")
-            
-            # Determine site type based on topics
-            site_type = "both"  # Default to both
-            if "API/SDK" in analysis.topic_tags:
-                site_type = "devhub"  # Focus on developer.atlan.com
-            elif any(tag in analysis.topic_tags for tag in ["Product", "Best practices", "SSO", "How-to"]):
-                site_type = "docs"  # Focus on docs.atlan.com
-            
-            async with self.tavily_rag as tavily:
-                # Search for real-time results with topic optimization
-                search_results = await tavily.search_documentation(ticket_text, site_type, max_results=5, topic_tags=analysis.topic_tags)
-                
-                if not search_results:
-                    return TavilyResponse(
-                        answer="I couldn't find current information about this topic in the documentation.",
+        analysis = await self.analyze_ticket(ticket_text)
+        site_type = self._tavily_site_type(analysis)
+        if site_type is None:
+            response = self._routing_response(analysis)
+        else:
+            response = None
+            # Share the pooled session across queries - the app's shutdown handler closes it
+            tavily = self.tavily_rag
+            search_results = await tavily.search_documentation(ticket_text, site_type, max_results=5, topic_tags=analysis.topic_tags)
+            if not search_results:
+                response = self._no_results_response()
+            else:
+                try:
+                    async for item in tavily.stream_realtime_answer(ticket_text, search_results, analysis.topic_tags):
+                        if isinstance(item, str):
+                            yield item
+                        else:
+                            response = TavilyResponse(
+                                answer=item.answer,
+                                sources=item.sources,
+                                confidence=item.confidence,
+                                is_tavily_used=True,
+                                routing_message=None
+                            )
+                except Exception as e:
+                    print(f"❌ Error streaming realtime answer: {e}")
+                    response = TavilyResponse(
+                        answer=f"Error generating answer: {str(e)}",
                         sources=[],
                         confidence=0.0,
                         is_tavily_used=True,
                         routing_message=None
                     )
-                
-                # Generate answer from real-time results
-                realtime_response = await tavily.generate_realtime_answer(ticket_text, search_results, analysis.topic_tags)
-                
-                return TavilyResponse(
-                    answer=realtime_response.answer,
-                    sources=realtime_response.sources,
-                    confidence=realtime_response.confidence,
-                    is_tavily_used=True,
-                    routing_message=None
-                )
-        else:
-            # Route to appropriate team - STRICT RULE: No Tavily for these topics
-            primary_topic = analysis.topic_tags[0] if analysis.topic_tags else "Other"
-            
-            # Create specific routing messages based on topic type
-            routing_messages = {
-                "Connector": "This ticket has been classified as a 'Connector' issue and routed to the appropriate team.",
-                "Lineage": "This ticket has been classified as a 'Lineage' issue and routed to the appropriate team.",
-                "Glossary": "This ticket has been classified as a 'Glossary' issue and routed to the appropriate team.",
-                "Sensitive data": "This ticket has been classified as a 'Sensitive data' issue and routed to the appropriate team.",
-                "Other": "This ticket has been classified as 'Other' and routed to the appropriate team."
-            }
-            
-            routing_message = routing_messages.get(primary_topic, f"This ticket has been classified as a '{primary_topic}' issue and routed to the appropriate team.")
-            
-            print(f"🚫 Routing to team for topic: {primary_topic} (Tavily not used per strict rule)")
-            
-            return TavilyResponse(
-                answer=routing_message,
-                sources=[],
-                confidence=1.0,
-                is_tavily_used=False,
-                routing_message=routing_message
-            )
+        
+        # Same cache entry and rule as process_and_analyze, so either path can serve the next hit
+        if response.confidence > 0:
+            await query_cache_set(cache_key, (analysis, response), PERFORMANCE_CONFIG['cache_duration'])
+        yield analysis, response
+    
+    def _tavily_site_type(self, analysis: TicketAnalysis) -> Optional[str]:
+        """Documentation site to search for this analysis, or None if the ticket is routed to a team"""
+        # STRICT RULE: Only use Tavily for specific topics
+        tavily_topics = {"How-to", "Product", "Best practices", "API/SDK", "SSO"}
+        if not any(tag in tavily_topics for tag in analysis.topic_tags):
+            return None
+        
+        # Use Tavily for real-time documentation search
+        print(f"🔍 Using Tavily for topics: {[tag for tag in analysis.topic_tags if tag in tavily_topics]}")
+        
+        # Determine site type based on topics
+        site_type = "both"  # Default to both
+        if "API/SDK" in analysis.topic_tags:
+            site_type = "devhub"  # Focus on developer.atlan.com
+        elif any(tag in analysis.topic_tags for tag in ["Product", "Best practices", "SSO", "How-to"]):
+            site_type = "docs"  # Focus on docs.atlan.com
+        return site_type
+    
+    def _no_results_response(self) -> TavilyResponse:
+        """Response when the documentation search comes back empty"""
+        return TavilyResponse(
+            answer="I couldn't find current information about this topic in the documentation.",
+            sources=[],
+            confidence=0.0,
+            is_tavily_used=True,
+            routing_message=None
+        )
+    
+    def _routing_response(self, analysis: TicketAnalysis) -> TavilyResponse:
+        """Route the ticket to the appropriate team - STRICT RULE: No Tavily for these topics"""
+        primary_topic = analysis.topic_tags[0] if analysis.topic_tags else "Other"
+        
+        # Create specific routing messages based on topic type
+        routing_messages = {
+            "Connector": "This ticket has been classified as a 'Connector' issue and routed to the appropriate team.",
+            "Lineage": "This ticket has been classified as a 'Lineage' issue and routed to the appropriate team.",
+            "Glossary": "This ticket has been classified as a 'Glossary' issue and routed to the appropriate team.",
+            "Sensitive data": "This ticket has been classified as a 'Sensitive data' issue and routed to the appropriate team.",
+            "Other": "This ticket has been classified as 'Other' and routed to the appropriate team."
+        }
+        
+        routing_message = routing_messages.get(primary_topic, f"This ticket has been classified as a '{primary_topic}' issue and routed to the appropriate team.")
+        
+        print(f"🚫 Routing to team for topic: {primary_topic} (Tavily not used per strict rule)")
+        
+        return TavilyResponse(
+            answer=routing_message,
+            sources=[],
+            confidence=1.0,
+            is_tavily_used=False,
+            routing_message=routing_message
+        )
+    
+    async def _respond(self, ticket_text: str, analysis: TicketAnalysis) -> TavilyResponse:
+        """Build the final response for an already-analyzed ticket"""
+        # Step 2: Determine if we should use Tavily or route to team
+        site_type = self._tavily_site_type(analysis)
+        if site_type is None:
+            return self._routing_response(analysis)
+        
+        tavily = self.tavily_rag
+        # Search for real-time results with topic optimization
+        search_results = await tavily.search_documentation(ticket_text, site_type, max_results=5, topic_tags=analysis.topic_tags)
+        
+        if not search_results:
+            return self._no_results_response()
+        
+        # Generate answer from real-time results
+        realtime_response = await tavily.generate_realtime_answer(ticket_text, search_results, analysis.topic_tags)
+        
+        return TavilyResponse(
+            answer=realtime_response.answer,
+            sources=realtime_response.sources,
+            confidence=realtime_response.confidence,
+            is_tavily_used=True,
+            routing_message=None
+        )
     
     async def get_system_stats(self) -> Dict[str, Any]:
         """Get system statistics"""
@@ -6,17 +6,29 @@ Enhances the existing RAG system with real-time web crawling capabilities
 
 import os
 import asyncio
-import json
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Union
+import re
 from dataclasses import dataclass
 import aiohttp
+import orjson
+import requests
 from groq import Groq
 from dotenv import load_dotenv
 import hashlib
 import time
 
+from tavily_config import TAVILY_CONFIG, PERFORMANCE_CONFIG, DOCS_SITES, build_search_payload, is_realtime, url_allowed
+
 load_dotenv()
 
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+# Names used in search logging for each DOCS_SITES entry
+DOCS_SITE_DESCRIPTIONS = {
+    "atlan_docs": "Atlan Product Documentation",
+    "atlan_devhub": "Atlan Developer Hub/API Documentation",
+}
+
 @dataclass
 class TavilySearchResult:
     title: str
@@ -64,49 +76,107 @@ class TavilyRAGIntegration:
             print("✅ Grok client initialized with httpx fallback in TavilyRAG")
         self.model = os.getenv("GROK_MODEL", "gemma2-9b-it")
         
+        # Groq request headers are built once instead of re-reading the key per answer
+        self._groq_request_headers = {
+            "Authorization": f"Bearer {grok_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        # Persistent HTTP session so repeated LLM calls reuse the TLS connection
+        self.http = requests.Session()
+        self.http.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        
         # Tavily API configuration
-        self.tavily_base_url = "https://api.tavily.com"
+        self.tavily_base_url = TAVILY_CONFIG["base_url"]
+        
+        # Pooled aiohttp session, reused across queries on the same event loop
         self.session = None
+        self._session_loop = None
+        self._search_sem = None
+        # Open `async with` blocks, and whether the outermost one opened the session
+        self._context_depth = 0
+        self._context_opened_session = False
+        
+        # Cache search results so repeated questions skip the Tavily round trip
+        self._search_cache = {}
+        self._search_cache_ttl = 3600
+        self._search_cache_max_size = 256
         
-        # Documentation site configurations
+        # Documentation site configurations - the shared DOCS_SITES table plus a display name,
+        # falling back to the site key for sites added to the config without one
         self.docs_sites = {
-            "atlan_docs": {
-                "base_url": "https://docs.atlan.com",
-                "search_terms": ["atlan documentation", "atlan docs", "atlan product"],
-                "include_domains": ["docs.atlan.com"],
-                "exclude_domains": ["developer.atlan.com"],
-                "description": "Atlan Product Documentation"
-            },
-            "atlan_devhub": {
-                "base_url": "https://developer.atlan.com", 
-                "search_terms": ["atlan api", "atlan developer", "atlan sdk", "atlan webhooks"],
-                "include_domains": ["developer.atlan.com"],
-                "exclude_domains": ["docs.atlan.com"],
-                "description": "Atlan Developer Hub/API Documentation"
-            }
+            name: {**site, "description": DOCS_SITE_DESCRIPTIONS.get(name, name)}
+            for name, site in DOCS_SITES.items()
         }
         
         print("✅ Tavily RAG Integration initialized")
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use or when the event loop changes"""
+        loop = asyncio.get_running_loop()
+        if self.session is not None and not self.session.closed and self._session_loop is not loop:
+            await self._close_stale_session()
+        if self.session is None or self.session.closed:
+            # Create connector without proxy settings; keep-alive lets later queries skip the TLS handshake
+            connector = aiohttp.TCPConnector(
+                limit=PERFORMANCE_CONFIG["max_concurrent_searches"],
+                limit_per_host=3,
+                keepalive_timeout=60
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=TAVILY_CONFIG["timeout"]),
+                headers={
+                    'Authorization': f'Bearer {self.tavily_api_key}',
+                    'Content-Type': 'application/json'
+                }
+            )
+            self._session_loop = loop
+            self._search_sem = asyncio.Semaphore(PERFORMANCE_CONFIG["max_concurrent_searches"])
+        return self.session
+
+    async def _close_stale_session(self):
+        """Close a pooled session left behind on another event loop instead of orphaning it"""
+        session, loop = self.session, self._session_loop
+        self.session = None
+        if loop.is_running():
+            # Still serving another thread - close it there, where its connections live
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        try:
+            await session.close()
+        except Exception as e:
+            print(f"⚠️ Error closing stale Tavily session: {e}")
+            session.detach()
+
     async def __aenter__(self):
-        # Create connector without proxy settings
-        connector = aiohttp.TCPConnector()
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={
-                'Authorization': f'Bearer {self.tavily_api_key}',
-                'Content-Type': 'application/json'
-            }
-        )
+        if self._context_depth == 0:
+            self._context_opened_session = self.session is None or self.session.closed
+        self._context_depth += 1
+        await self._get_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        # Close the session only if this context opened it; long-lived owners
+        # use the instance directly and call close() on shutdown
+        self._context_depth -= 1
+        if self._context_depth == 0 and self._context_opened_session:
+            await self.close()
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self.session and not self.session.closed:
             await self.session.close()
+        self.session = None
 
     async def search_documentation(self, query: str, site_type: str = "both", max_results: int = 5, topic_tags: List[str] = None) -> List[TavilySearchResult]:
         """Search documentation using Tavily API with optimized prompt-based guidance"""
+        cache_key = hashlib.md5(f"{query}|{site_type}|{max_results}|{topic_tags}".encode()).hexdigest()
+        cached = self._search_cache.get(cache_key)
+        if cached and time.time() - cached[0] < self._search_cache_ttl:
+            print(f"⚡ Using cached Tavily results for: {query}")
+            return cached[1]
+        
         try:
             # Use optimized search prompt if topic_tags are provided
             if topic_tags:
@@ -119,15 +189,19 @@ class TavilyRAGIntegration:
             
             # Determine which sites to search
             if site_type == "docs":
-                sites = [self.docs_sites["atlan_docs"]]
+                sites = ["atlan_docs"]
             elif site_type == "devhub":
-                sites = [self.docs_sites["atlan_devhub"]]
+                sites = ["atlan_devhub"]
             else:
-                sites = list(self.docs_sites.values())
+                sites = list(self.docs_sites)
             
-            all_results = []
+            session = await self._get_session()
+            # Bind the semaphore that belongs to this session's loop for the whole query
+            search_sem = self._search_sem
             
-            for site_config in sites:
+            async def search_site(site_name: str) -> List[TavilySearchResult]:
+                site_config = self.docs_sites[site_name]
+                
                 # Use the enhanced query from optimization
                 final_query = enhanced_query if topic_tags else query
                 
@@ -135,50 +209,63 @@ class TavilyRAGIntegration:
                 if not final_query.endswith(f"site:{site_config['base_url']}"):
                     final_query = f"{final_query} site:{site_config['base_url']}"
                 
-                # Tavily search parameters
+                # Tavily search parameters - the cached "detailed" template for this site
                 search_params = {
+                    **build_search_payload(site_name, "detailed"),
                     "query": final_query,
-                    "search_depth": "advanced",
-                    "include_answer": True,
-                    "include_raw_content": True,
-                    "max_results": max_results,
-                    "include_domains": site_config.get("include_domains", []),
-                    "exclude_domains": site_config.get("exclude_domains", []),
-                    "include_images": False,
-                    "include_raw_html": False
+                    "max_results": max_results
                 }
                 
                 print(f"🔍 Searching {site_config['description']} for: {query}")
                 
-                # Make API request
-                async with self.session.post(
-                    f"{self.tavily_base_url}/search",
-                    json=search_params
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        results = self._process_tavily_results(data, site_config)
-                        all_results.extend(results)
-                        print(f"✅ Found {len(results)} results from {site_config['description']}")
-                    else:
+                # Make API request - the semaphore caps in-flight searches to avoid rate limiting
+                async with search_sem:
+                    async with session.post(
+                        f"{self.tavily_base_url}/search",
+                        json=search_params
+                    ) as response:
+                        if response.status == 200:
+                            data = orjson.loads(await response.read())
+                            results = self._process_tavily_results(data, site_config)
+                            print(f"✅ Found {len(results)} results from {site_config['description']}")
+                            return results
                         print(f"⚠️ Tavily API error for {site_config['description']}: {response.status}")
-                        continue
-                
-                # Small delay between requests
-                await asyncio.sleep(0.5)
+                        return []
             
-            return all_results[:max_results]
+            # Search all sites concurrently, keeping results in site order
+            site_results = await asyncio.gather(*[search_site(site_name) for site_name in sites])
+            all_results = [result for results in site_results for result in results]
+            
+            results = all_results[:max_results]
+            if results:
+                self._cache_search_results(cache_key, results)
+            return results
             
         except Exception as e:
             print(f"❌ Error searching with Tavily: {e}")
             return []
 
+    def clear_search_cache(self):
+        """Drop cached Tavily search results so the next query searches again"""
+        self._search_cache.clear()
+
+    def _cache_search_results(self, cache_key: str, results: List[TavilySearchResult]):
+        """Cache search results with size management"""
+        if len(self._search_cache) >= self._search_cache_max_size:
+            # Drop the oldest entry (dicts keep insertion order)
+            del self._search_cache[next(iter(self._search_cache))]
+        
+        self._search_cache[cache_key] = (time.time(), results)
+
     def _process_tavily_results(self, data: Dict, site_config: Dict) -> List[TavilySearchResult]:
         """Process Tavily API response into structured results"""
         results = []
         
         if "results" in data:
             for item in data["results"]:
+                # Skip assets and off-site pages that slipped past the domain filters
+                if not url_allowed(item.get("url", "")):
+                    continue
                 result = TavilySearchResult(
                     title=item.get("title", ""),
                     url=item.get("url", ""),
@@ -248,49 +335,42 @@ class TavilyRAGIntegration:
         
         return enhanced_query, site_type
 
-    async def generate_realtime_answer(self, query: str, search_results: List[TavilySearchResult], 
-                                     topic_tags: List[str] = None) -> EnhancedRAGResponse:
-        """Generate answer using real-time search results"""
-        try:
-            if not search_results:
-                return EnhancedRAGResponse(
-                    answer="I couldn't find current information about this topic in the documentation.",
-                    sources=[],
-                    confidence=0.0,
-                    evidence={"search_results": 0},
-                    is_realtime=True
-                )
-            
-            # Prepare context from search results for better summarization
-            context_parts = []
-            sources = []
-            
-            for i, result in enumerate(search_results):
-                # Include more structured information for better summarization
-                context_parts.append(f"""**Source {i+1}: {result.title}**
+    def _groq_headers(self) -> Dict[str, str]:
+        """Headers for Groq chat completion requests"""
+        return self._groq_request_headers
+
+    def _prepare_answer_request(self, query: str, search_results: List[TavilySearchResult]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], float]:
+        """Build the chat completion payload, structured sources and average search score for an answer"""
+        # Prepare context from search results for better summarization
+        context_parts = []
+        sources = []
+        seen_urls = set()
+        
+        for i, result in enumerate(search_results):
+            # Include more structured information for better summarization
+            context_parts.append(f"""**Source {i+1}: {result.title}**
 URL: {result.url}
 Relevance Score: {result.score:.2f}
 Content: {result.content}
 
 ---""")
-                # Create structured source objects instead of just URLs
-                source_obj = {
+            # Create structured source objects instead of just URLs, avoiding duplicates
+            if result.url not in seen_urls:
+                seen_urls.add(result.url)
+                content = result.content
+                sources.append({
                     "title": result.title,
                     "url": result.url,
-                    "snippet": result.content[:200] + "..." if len(result.content) > 200 else result.content
-                }
-                # Avoid duplicates
-                if not any(s["url"] == result.url for s in sources):
-                    sources.append(source_obj)
-            
-            context = "\n\n".join(context_parts)
-            
-            # Calculate confidence based on search scores
-            avg_score = sum(result.score for result in search_results) / len(search_results)
-            confidence = min(1.0, avg_score)
-            
-            # Generate answer using Claude with enhanced summarization
-            prompt = f"""You are an expert Atlan support assistant. Summarize and synthesize the current documentation to provide a comprehensive answer to the user's question.
+                    "snippet": content[:200] + "..." if len(content) > 200 else content
+                })
+        
+        context = "\n\n".join(context_parts)
+        
+        # Average search score, used as the answer confidence
+        avg_score = sum(result.score for result in search_results) / len(search_results)
+        
+        # Generate answer using Claude with enhanced summarization
+        prompt = f"""You are an expert Atlan support assistant. Summarize and synthesize the current documentation to provide a comprehensive answer to the user's question.
 
 Question: {query}
 
@@ -318,54 +398,65 @@ Response Format:
 
 Answer:"""
 
-            # Use direct HTTP request instead of Groq client for Railway compatibility
-            import requests
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You are an expert Atlan support assistant specializing in summarizing and synthesizing documentation. Your role is to:\n\n1. **Summarize** complex documentation into clear, actionable guidance\n2. **Synthesize** information from multiple sources into coherent responses\n3. **Structure** answers with clear sections and bullet points\n4. **Extract** key steps, requirements, and important details\n5. **Provide** comprehensive yet concise answers\n6. **Reference** sources naturally within your responses\n\nAlways prioritize accuracy, clarity, and actionable guidance based on the current Atlan documentation."},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 1500,
+            "temperature": 0.1
+        }
+        
+        return data, sources, avg_score
+
+    def clean_answer(self, answer: str) -> str:
+        """Remove any source sections or URLs the model included in its answer"""
+        # Remove various source patterns (more aggressive cleaning)
+        answer = re.sub(r'\*\*Sources?:\*\*\s*\n.*', '', answer, flags=re.MULTILINE | re.DOTALL)
+        answer = re.sub(r'\n\s*•\s*https?://[^\s]+', '', answer)
+        answer = re.sub(r'\n\s*🔗\s*https?://[^\s]+', '', answer)
+        answer = re.sub(r'\n\s*\*\*📚\s*Sources?:\*\*\s*\n.*', '', answer, flags=re.MULTILINE | re.DOTALL)
+        answer = re.sub(r'\*\*📚\s*Sources?:\*\*.*', '', answer, flags=re.MULTILINE | re.DOTALL)
+        
+        # Remove any remaining URL patterns
+        answer = re.sub(r'\n\s*https?://[^\s]+', '', answer)
+        answer = re.sub(r'https?://[^\s]+', '', answer)  # Remove any standalone URLs
+        
+        # Remove any lines that start with source-related keywords
+        answer = re.sub(r'\n\s*(Sources?|Links?|References?):\s*\n.*', '', answer, flags=re.MULTILINE | re.DOTALL)
+        
+        # Remove any developer.atlan.com or docs.atlan.com URLs specifically
+        answer = re.sub(r'https?://(developer|docs)\.atlan\.com[^\s]*', '', answer)
+        
+        # Remove any trailing empty lines and clean up
+        answer = re.sub(r'\n\s*\n\s*\n+', '\n\n', answer)
+        return answer.strip()
+
+    async def generate_realtime_answer(self, query: str, search_results: List[TavilySearchResult], 
+                                     topic_tags: List[str] = None) -> EnhancedRAGResponse:
+        """Generate answer using real-time search results"""
+        try:
+            if not search_results:
+                return EnhancedRAGResponse(
+                    answer="I couldn't find current information about this topic in the documentation.",
+                    sources=[],
+                    confidence=0.0,
+                    evidence={"search_results": 0},
+                    is_realtime=True
+                )
             
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            grok_api_key = os.getenv("GROK_API_KEY", "").strip()
-            headers = {
-                "Authorization": f"Bearer {grok_api_key}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": "You are an expert Atlan support assistant specializing in summarizing and synthesizing documentation. Your role is to:\n\n1. **Summarize** complex documentation into clear, actionable guidance\n2. **Synthesize** information from multiple sources into coherent responses\n3. **Structure** answers with clear sections and bullet points\n4. **Extract** key steps, requirements, and important details\n5. **Provide** comprehensive yet concise answers\n6. **Reference** sources naturally within your responses\n\nAlways prioritize accuracy, clarity, and actionable guidance based on the current Atlan documentation."},
-                    {"role": "user", "content": prompt}
-                ],
-                "max_tokens": 1500,
-                "temperature": 0.1
-            }
+            data, sources, avg_score = self._prepare_answer_request(query, search_results)
+            confidence = min(1.0, avg_score)
             
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            # Use direct HTTP request instead of Groq client for Railway compatibility
+            # requests blocks, so it runs in a worker thread rather than on the event loop
+            response = await asyncio.to_thread(
+                self.http.post, GROQ_CHAT_URL, headers=self._groq_headers(), json=data, timeout=30
+            )
             response.raise_for_status()
             
-            answer = response.json()["choices"][0]["message"]["content"].strip()
-            
-            # Clean up any source URLs that might have been included in the answer
-            # Remove common source patterns
-            import re
-            
-            # Remove various source patterns (more aggressive cleaning)
-            answer = re.sub(r'\*\*Sources?:\*\*\s*\n.*', '', answer, flags=re.MULTILINE | re.DOTALL)
-            answer = re.sub(r'\n\s*•\s*https?://[^\s]+', '', answer)
-            answer = re.sub(r'\n\s*🔗\s*https?://[^\s]+', '', answer)
-            answer = re.sub(r'\n\s*\*\*📚\s*Sources?:\*\*\s*\n.*', '', answer, flags=re.MULTILINE | re.DOTALL)
-            answer = re.sub(r'\*\*📚\s*Sources?:\*\*.*', '', answer, flags=re.MULTILINE | re.DOTALL)
-            
-            # Remove any remaining URL patterns
-            answer = re.sub(r'\n\s*https?://[^\s]+', '', answer)
-            answer = re.sub(r'https?://[^\s]+', '', answer)  # Remove any standalone URLs
-            
-            # Remove any lines that start with source-related keywords
-            answer = re.sub(r'\n\s*(Sources?|Links?|References?):\s*\n.*', '', answer, flags=re.MULTILINE | re.DOTALL)
-            
-            # Remove any developer.atlan.com or docs.atlan.com URLs specifically
-            answer = re.sub(r'https?://(developer|docs)\.atlan\.com[^\s]*', '', answer)
-            
-            # Remove any trailing empty lines and clean up
-            answer = re.sub(r'\n\s*\n\s*\n+', '\n\n', answer)
-            answer = answer.strip()
+            answer = self.clean_answer(orjson.loads(response.content)["choices"][0]["message"]["content"].strip())
             
             return EnhancedRAGResponse(
                 answer=answer,
@@ -389,6 +480,44 @@ Answer:"""
                 is_realtime=True
             )
 
+    async def stream_realtime_answer(self, query: str, search_results: List[TavilySearchResult],
+                                   topic_tags: List[str] = None) -> AsyncIterator[Union[str, EnhancedRAGResponse]]:
+        """
+        Stream the answer text as it is generated, using Groq's server-sent events.
+        Runs on the pooled aiohttp session. Yields raw text chunks, then a final
+        EnhancedRAGResponse with the cleaned answer and its sources.
+        """
+        data, sources, avg_score = self._prepare_answer_request(query, search_results)
+        data["stream"] = True
+        
+        chunks = []
+        session = await self._get_session()
+        async with session.post(GROQ_CHAT_URL, headers=self._groq_headers(), json=data) as response:
+            response.raise_for_status()
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                delta = orjson.loads(payload)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+        
+        yield EnhancedRAGResponse(
+            answer=self.clean_answer("".join(chunks).strip()),
+            sources=sources,
+            confidence=min(1.0, avg_score),
+            evidence={
+                "search_results": len(search_results),
+                "avg_score": avg_score,
+                "search_type": "realtime"
+            },
+            is_realtime=True
+        )
+
     async def should_use_realtime_search(self, query: str, topic_tags: List[str], 
                                        static_confidence: float) -> bool:
         """Determine if real-time search should be used - STRICT RULE"""
@@ -403,14 +532,7 @@ Answer:"""
             return False
         
         # For allowed topics, use additional criteria for optimization
-        time_sensitive_keywords = [
-            "latest", "new", "recent", "updated", "current", "2024", "2025",
-            "recently", "just released", "new feature", "latest version"
-        ]
-        
-        # Check for time-sensitive keywords
-        query_lower = query.lower()
-        has_time_keywords = any(keyword in query_lower for keyword in time_sensitive_keywords)
+        has_time_keywords = is_realtime(query)
         
         # Use real-time if static confidence is low OR has time-sensitive indicators OR is allowed topic
         return static_confidence < 0.7 or has_time_keywords or has_allowed_topics
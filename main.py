@@ -15,18 +15,21 @@ from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from datetime import datetime
-import sys
 import tempfile
 import shutil
+import time
+import statistics
+from collections import Counter
 
-# Add ai_pipeline to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'ai_pipeline'))
-
-from simple_tavily_system import get_simple_tavily_system, SimpleTavilySystem
-from file_parser import file_parser
+from ai_pipeline.simple_tavily_system import get_simple_tavily_system, SimpleTavilySystem
+from ai_pipeline.file_parser import file_parser
 
 load_dotenv()
 
+# API keys are read once at import - restart the server to pick up new keys
+GROK_API_KEY = os.getenv("GROK_API_KEY", "").strip()
+TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+
 app = FastAPI(title="Atlan Customer Copilot API", version="1.0.0")
 
 # CORS middleware
@@ -41,6 +44,9 @@ app.add_middleware(
 # Initialize components
 simple_tavily_system = None
 
+# Uploads larger than this are rejected before their bytes are read
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
 class TicketInput(BaseModel):
     text: str
     channel: Optional[str] = "web"
@@ -63,15 +69,17 @@ async def startup_event():
         print("🚀 Initializing Simple Tavily System...")
         
         # Check if required environment variables are present
-        grok_key = os.getenv("GROK_API_KEY", "").strip()
-        tavily_key = os.getenv("TAVILY_API_KEY")
-        
-        print(f"🔍 Debug - GROK_API_KEY present: {bool(grok_key)}")
-        print(f"🔍 Debug - TAVILY_API_KEY present: {bool(tavily_key)}")
-        if grok_key:
-            print(f"🔍 Debug - GROK_API_KEY starts with: {grok_key[:10]}...")
-        if tavily_key:
-            print(f"🔍 Debug - TAVILY_API_KEY starts with: {tavily_key[:10]}...")
+        grok_key = GROK_API_KEY
+        tavily_key = TAVILY_API_KEY
+        
+        # Debug-only logging - compiled out under python -O / PYTHONOPTIMIZE=1
+        if __debug__:
+            print(f"🔍 Debug - GROK_API_KEY present: {bool(grok_key)}")
+            print(f"🔍 Debug - TAVILY_API_KEY present: {bool(tavily_key)}")
+            if grok_key:
+                print(f"🔍 Debug - GROK_API_KEY starts with: {grok_key[:10]}...")
+            if tavily_key:
+                print(f"🔍 Debug - TAVILY_API_KEY starts with: {tavily_key[:10]}...")
         
         if not grok_key:
             print("⚠️ GROK_API_KEY not found - AI features will be limited")
@@ -89,94 +97,115 @@ async def startup_event():
         # Don't raise the exception to prevent startup failure
         # The health check will indicate the system is not ready
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled HTTP connections on shutdown"""
+    if simple_tavily_system and simple_tavily_system.tavily_rag:
+        await simple_tavily_system.tavily_rag.close()
+
 # Root route removed - will be handled by catch-all route for React app
 
+# Cached health-check timestamp (refreshed at most once per second)
+_ts_cache = [0.0, ""]
+
+def _now_iso() -> str:
+    """Return the current time as an ISO string, cached with a 1s TTL"""
+    t = time.time()
+    if t - _ts_cache[0] > 1.0:
+        _ts_cache[:] = [t, datetime.fromtimestamp(t).isoformat()]
+    return _ts_cache[1]
+
 @app.get("/api/health")
 async def health_check():
     """Detailed health check endpoint"""
     try:
         # Check environment variables
-        grok_key = os.getenv("GROK_API_KEY", "").strip()
-        tavily_key = os.getenv("TAVILY_API_KEY")
+        grok_key = GROK_API_KEY
+        tavily_key = TAVILY_API_KEY
         
-        return {
+        health = {
             "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "simple_tavily_system": simple_tavily_system is not None and hasattr(simple_tavily_system, 'initialized') and simple_tavily_system.initialized,
             "grok_key_present": bool(grok_key),
-            "tavily_key_present": bool(tavily_key),
-            "grok_key_start": grok_key[:10] + "..." if grok_key else None,
-            "tavily_key_start": tavily_key[:10] + "..." if tavily_key else None
+            "tavily_key_present": bool(tavily_key)
         }
+        # Debug-only key prefixes - compiled out under python -O / PYTHONOPTIMIZE=1
+        if __debug__:
+            health["grok_key_start"] = grok_key[:10] + "..." if grok_key else None
+            health["tavily_key_start"] = tavily_key[:10] + "..." if tavily_key else None
+        return health
     except Exception as e:
         return {
             "status": "unhealthy",
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
 
-@app.get("/api/test-grok")
-async def test_grok():
-    """Test Grok API directly"""
-    try:
-        import requests
-        
-        grok_key = os.getenv("GROK_API_KEY", "").strip()
-        if not grok_key:
-            return {"error": "GROK_API_KEY not found"}
-        
-        # Debug: Show API key details
-        debug_info = {
-            "key_present": bool(grok_key),
-            "key_length": len(grok_key),
-            "key_start": grok_key[:10] + "..." if grok_key else None,
-            "key_end": "..." + grok_key[-10:] if grok_key and len(grok_key) > 10 else None,
-            "key_has_newline": "\\n" in grok_key if grok_key else False,
-            "key_has_carriage_return": "\\r" in grok_key if grok_key else False,
-            "raw_key_bytes": [ord(c) for c in grok_key[:20]] if grok_key else None
-        }
+# Debug endpoint - not registered under python -O / PYTHONOPTIMIZE=1
+if __debug__:
+    @app.get("/api/test-grok")
+    async def test_grok():
+        """Test Grok API directly"""
+        try:
+            import requests
+        
+            grok_key = GROK_API_KEY
+            if not grok_key:
+                return {"error": "GROK_API_KEY not found"}
+        
+            # Debug: Show API key details
+            debug_info = {
+                "key_present": bool(grok_key),
+                "key_length": len(grok_key),
+                "key_start": grok_key[:10] + "..." if grok_key else None,
+                "key_end": "..." + grok_key[-10:] if grok_key and len(grok_key) > 10 else None,
+                "key_has_newline": "\\n" in grok_key if grok_key else False,
+                "key_has_carriage_return": "\\r" in grok_key if grok_key else False,
+                "raw_key_bytes": [ord(c) for c in grok_key[:20]] if grok_key else None
+            }
         
-        # Test the exact same request that SentimentAgent makes
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {grok_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": "gemma2-9b-it",
-            "messages": [
-                {"role": "system", "content": "You are a ticket classifier. Respond with JSON only. No reasoning, no explanations, no additional text. Just the JSON object."},
-                {"role": "user", "content": "Classify this ticket: Hello, I need help with SSO setup"}
-            ],
-            "max_tokens": 1000,
-            "temperature": 0.1
-        }
+            # Test the exact same request that SentimentAgent makes
+            url = "https://api.groq.com/openai/v1/chat/completions"
+            headers = {
+                "Authorization": f"Bearer {grok_key}",
+                "Content-Type": "application/json"
+            }
+            data = {
+                "model": "gemma2-9b-it",
+                "messages": [
+                    {"role": "system", "content": "You are a ticket classifier. Respond with JSON only. No reasoning, no explanations, no additional text. Just the JSON object."},
+                    {"role": "user", "content": "Classify this ticket: Hello, I need help with SSO setup"}
+                ],
+                "max_tokens": 1000,
+                "temperature": 0.1
+            }
         
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = requests.post(url, headers=headers, json=data, timeout=30)
         
-        if response.status_code == 200:
-            result = response.json()
-            return {
-                "status": "success",
-                "response": result["choices"][0]["message"]["content"],
-                "status_code": response.status_code,
-                "debug": debug_info
-            }
-        else:
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "status": "success",
+                    "response": result["choices"][0]["message"]["content"],
+                    "status_code": response.status_code,
+                    "debug": debug_info
+                }
+            else:
+                return {
+                    "status": "error",
+                    "status_code": response.status_code,
+                    "response": response.text,
+                    "debug": debug_info
+                }
+            
+        except Exception as e:
             return {
                 "status": "error",
-                "status_code": response.status_code,
-                "response": response.text,
-                "debug": debug_info
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "debug": debug_info if 'debug_info' in locals() else None
             }
-            
-    except Exception as e:
-        return {
-            "status": "error",
-            "error": str(e),
-            "error_type": type(e).__name__,
-            "debug": debug_info if 'debug_info' in locals() else None
-        }
 
 @app.post("/api/tickets", response_model=TicketResponse)
 async def process_ticket(ticket: TicketInput):
@@ -402,43 +431,27 @@ async def get_sentiment_report():
 def generate_summary_statistics(tickets: List[Dict]) -> Dict[str, Any]:
     """Generate summary statistics from classified tickets"""
     
-    # Count by sentiment
-    sentiment_counts = {}
-    topic_counts = {}
-    priority_counts = {}
-    confidence_scores = []
+    classifications = [ticket.get('classification', {}) for ticket in tickets]
     
-    for ticket in tickets:
-        classification = ticket.get('classification', {})
-        
-        # Sentiment counts
-        sentiment = classification.get('sentiment', 'Unknown')
-        sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-        
-        # Topic counts
-        topics = classification.get('topic_tags', [])
-        for topic in topics:
-            topic_counts[topic] = topic_counts.get(topic, 0) + 1
-        
-        # Priority counts
-        priority = classification.get('priority', 'Unknown')
-        priority_counts[priority] = priority_counts.get(priority, 0) + 1
-        
-        # Confidence scores
-        confidence = classification.get('confidence', 0)
-        confidence_scores.append(confidence)
+    # Count by sentiment, topic and priority
+    sentiment_counts = Counter(c.get('sentiment', 'Unknown') for c in classifications)
+    topic_counts = Counter(topic for c in classifications for topic in c.get('topic_tags', []))
+    priority_counts = Counter(c.get('priority', 'Unknown') for c in classifications)
+    
+    # Confidence scores
+    confidence_scores = [c.get('confidence', 0) for c in classifications]
     
     # Calculate average confidence
-    avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
+    avg_confidence = statistics.fmean(confidence_scores) if confidence_scores else 0
     
     return {
         "total_tickets": len(tickets),
-        "sentiment_distribution": sentiment_counts,
-        "topic_distribution": topic_counts,
-        "priority_distribution": priority_counts,
+        "sentiment_distribution": dict(sentiment_counts),
+        "topic_distribution": dict(topic_counts),
+        "priority_distribution": dict(priority_counts),
         "average_confidence": round(avg_confidence, 3),
-        "high_confidence_tickets": len([c for c in confidence_scores if c > 0.8]),
-        "low_confidence_tickets": len([c for c in confidence_scores if c < 0.5])
+        "high_confidence_tickets": sum(1 for c in confidence_scores if c > 0.8),
+        "low_confidence_tickets": sum(1 for c in confidence_scores if c < 0.5)
     }
 
 @app.post("/api/interactive-agent")
@@ -453,11 +466,8 @@ async def process_interactive_ticket(ticket: TicketInput):
     try:
         print(f"🔍 Processing interactive ticket with Simple Tavily System: {ticket.text[:50]}...")
         
-        # Process ticket with simple Tavily system
-        tavily_response = await simple_tavily_system.process_ticket(ticket.text)
-        
-        # Get internal analysis (classification details)
-        analysis = await simple_tavily_system.analyze_ticket(ticket.text)
+        # Process ticket and get internal analysis from a single classification pass
+        analysis, tavily_response = await simple_tavily_system.process_and_analyze(ticket.text)
         
         # Prepare analysis data for left panel (Internal Analysis View)
         internal_analysis = {
@@ -466,7 +476,7 @@ async def process_interactive_ticket(ticket: TicketInput):
             "priority": analysis.priority,
             "confidence": analysis.confidence,
             "reasoning": analysis.reasoning,
-                "classification_time": datetime.now().isoformat()
+            "classification_time": time.strftime("%Y-%m-%dT%H:%M:%S")
         }
         
         # Prepare final response data for right panel (Final Response View)
@@ -500,11 +510,8 @@ async def realtime_search(ticket: TicketInput):
     try:
         print(f"🔍 Performing real-time search: {ticket.text[:50]}...")
         
-        # Process ticket with Tavily system
-        tavily_response = await simple_tavily_system.process_ticket(ticket.text)
-        
-        # Get internal analysis
-        analysis = await simple_tavily_system.analyze_ticket(ticket.text)
+        # Process ticket and get internal analysis from a single classification pass
+        analysis, tavily_response = await simple_tavily_system.process_and_analyze(ticket.text)
         
         return {
             "internal_analysis": {
@@ -544,6 +551,39 @@ async def get_rag_stats():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting Tavily stats: {str(e)}")
 
+def check_upload(file: UploadFile) -> Optional[Dict[str, Any]]:
+    """
+    Cheap pre-read validation of an upload using only its filename and size.
+    Returns None if the file may be read, otherwise the status code and error content.
+    """
+    ext = os.path.splitext(file.filename or "")[1].lower()
+    if ext not in file_parser.supported_formats:
+        return {
+            "status_code": 400,
+            "content": {
+                "success": False,
+                "error": f"Unsupported file format: {ext}",
+                "supported_formats": list(file_parser.supported_formats.keys())
+            }
+        }
+    
+    # The spooled upload knows its own size; multipart parts rarely carry a content-length
+    size = getattr(file, "size", None)
+    if size is None and file.headers:
+        content_length = file.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            size = int(content_length)
+    if size is not None and size > MAX_UPLOAD_BYTES:
+        return {
+            "status_code": 413,
+            "content": {
+                "success": False,
+                "error": f"File too large: {size} bytes (max {MAX_UPLOAD_BYTES} bytes)"
+            }
+        }
+    
+    return None
+
 @app.post("/api/upload")
 async def upload_file(file: UploadFile = File(...)):
     """
@@ -553,6 +593,11 @@ async def upload_file(file: UploadFile = File(...)):
     try:
         print(f"📁 Processing uploaded file: {file.filename}")
         
+        # Reject unsupported or oversized files before reading their bytes
+        rejection = check_upload(file)
+        if rejection:
+            return JSONResponse(status_code=rejection["status_code"], content=rejection["content"])
+        
         # Read file content
         file_content = await file.read()
         
@@ -657,6 +702,16 @@ async def upload_multiple_files(files: List[UploadFile] = File(...)):
         
         for file in files:
             try:
+                # Reject unsupported or oversized files before reading their bytes
+                rejection = check_upload(file)
+                if rejection:
+                    file_results.append({
+                        "filename": file.filename,
+                        "success": False,
+                        "error": rejection["content"]["error"]
+                    })
+                    continue
+                
                 # Read file content
                 file_content = await file.read()
                 
@@ -806,10 +861,11 @@ if __name__ == "__main__":
     import os
     
     # Debug: Show all environment variables
-    print("🔍 Environment variables:")
-    for key, value in os.environ.items():
-        if 'PORT' in key.upper():
-            print(f"  {key}={value}")
+    if __debug__:
+        print("🔍 Environment variables:")
+        for key, value in os.environ.items():
+            if 'PORT' in key.upper():
+                print(f"  {key}={value}")
     
     # Get port with fallback
     port_str = os.getenv("PORT", "8000")
@@ -6,46 +6,119 @@ Starts both backend and frontend with proper error handling
 
 import os
 import sys
-import subprocess
-import time
+import asyncio
 import signal
-import threading
 from pathlib import Path
 
+BACKEND_LOG = Path("backend.log")
+FRONTEND_LOG = Path("frontend.log")
+
+# Stream buffer limit, and the longest partial line held back before it is echoed anyway
+OUTPUT_LINE_LIMIT = 1024 * 1024
+# Bytes read from a service's output per pump iteration
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+def _tail(path, lines=20):
+    """Return the last lines of a log file"""
+    try:
+        with open(path, "r", errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
+    except OSError:
+        return ""
+
+def _signal_service(process, sig):
+    """Signal a service and everything it spawned (npm runs the dev server as a grandchild)"""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, sig)
+        elif sig == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+async def _port_open(port, host="127.0.0.1"):
+    """Check whether something is accepting connections on host:port"""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=0.2)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
 class SystemStarter:
     def __init__(self):
         self.backend_process = None
         self.frontend_process = None
-        self.running = True
+        self.backend_log = None
+        self.frontend_log = None
+        self.pumps = []
+    
+    async def _pump_output(self, stream, name, log):
+        """Drain a child's output as it arrives, echoing it with a prefix and appending it to the log file"""
+        # Read fixed-size chunks rather than lines - readline() raises on overlong lines,
+        # which would stop the pump and let the child block on a full pipe
+        pending = b""
+        while True:
+            chunk = await stream.read(OUTPUT_CHUNK_SIZE)
+            if not chunk:
+                break
+            log.write(chunk.decode(errors="replace"))
+            log.flush()
+            *lines, pending = (pending + chunk).split(b"\n")
+            if len(pending) > OUTPUT_LINE_LIMIT:
+                lines.append(pending)
+                pending = b""
+            for line in lines:
+                sys.stdout.write(f"[{name}] {line.decode(errors='replace')}\n")
+            sys.stdout.flush()
+        if pending:
+            sys.stdout.write(f"[{name}] {pending.decode(errors='replace')}\n")
+            sys.stdout.flush()
+    
+    async def _wait_ready(self, process, port, timeout=30):
+        """Wait until the process accepts connections on port, or exits, or times out"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            if process.returncode is not None:
+                return False
+            if await _port_open(port):
+                return True
+            await asyncio.sleep(0.05)
+        return False
         
-    def start_backend(self):
+    async def start_backend(self):
         """Start the FastAPI backend"""
         print("🚀 Starting Backend Server...")
         try:
-            self.backend_process = subprocess.Popen(
-                [sys.executable, "main.py"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+            # Output is drained continuously by a pump task; an undrained PIPE blocks the child once full
+            self.backend_log = open(BACKEND_LOG, "a")
+            self.backend_process = await asyncio.create_subprocess_exec(
+                sys.executable, "main.py",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=OUTPUT_LINE_LIMIT,
+                start_new_session=True
             )
+            self.pumps.append(asyncio.create_task(
+                self._pump_output(self.backend_process.stdout, "backend", self.backend_log)
+            ))
             
-            # Give it a moment to start
-            time.sleep(3)
-            
-            if self.backend_process.poll() is None:
-                port = os.getenv("PORT", "8000")
+            port = os.getenv("PORT", "8000")
+            if await self._wait_ready(self.backend_process, int(port)):
                 print(f"✅ Backend server started on http://localhost:{port}")
                 return True
             else:
-                stdout, stderr = self.backend_process.communicate()
-                print(f"❌ Backend failed to start: {stderr}")
+                print(f"❌ Backend failed to start (see {BACKEND_LOG})")
                 return False
                 
         except Exception as e:
             print(f"❌ Error starting backend: {e}")
             return False
     
-    def start_frontend(self):
+    async def start_frontend(self):
         """Start the React frontend"""
         print("🚀 Starting Frontend Server...")
         try:
@@ -54,73 +127,88 @@ class SystemStarter:
                 print("❌ Client directory not found")
                 return False
             
-            self.frontend_process = subprocess.Popen(
-                ["npm", "start"],
+            self.frontend_log = open(FRONTEND_LOG, "a")
+            self.frontend_process = await asyncio.create_subprocess_exec(
+                "npm", "start",
                 cwd=client_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=OUTPUT_LINE_LIMIT,
+                start_new_session=True
             )
+            self.pumps.append(asyncio.create_task(
+                self._pump_output(self.frontend_process.stdout, "frontend", self.frontend_log)
+            ))
             
-            # Give it a moment to start
-            time.sleep(5)
-            
-            if self.frontend_process.poll() is None:
+            if await self._wait_ready(self.frontend_process, 3000, timeout=120):
                 print("✅ Frontend server started on http://localhost:3000")
                 return True
             else:
-                stdout, stderr = self.frontend_process.communicate()
-                print(f"❌ Frontend failed to start: {stderr}")
+                print(f"❌ Frontend failed to start (see {FRONTEND_LOG})")
                 return False
                 
         except Exception as e:
             print(f"❌ Error starting frontend: {e}")
             return False
     
-    def check_health(self):
-        """Check if both services are running"""
-        backend_ok = self.backend_process and self.backend_process.poll() is None
-        frontend_ok = self.frontend_process and self.frontend_process.poll() is None
+    async def _stop(self, process, name, log_path):
+        """Terminate a service, escalating to kill if it does not exit in time"""
+        if process.returncode is not None:
+            # Already exited (or crashed) - report that, but still clean up anything it spawned
+            _signal_service(process, signal.SIGTERM)
+            print(f"⚠️ {name} had already exited with code {process.returncode}")
+            tail = _tail(log_path)
+            if tail:
+                print(f"Last {name.lower()} output:\n{tail}")
+            return
         
-        return backend_ok, frontend_ok
+        _signal_service(process, signal.SIGTERM)
+        try:
+            # The output pump keeps draining the pipe, so waiting cannot deadlock on a full buffer
+            await asyncio.wait_for(process.wait(), timeout=5)
+            print(f"✅ {name} stopped")
+        except asyncio.TimeoutError:
+            _signal_service(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+            await process.wait()
+            print(f"⚠️ {name} force stopped")
+            tail = _tail(log_path)
+            if tail:
+                print(f"Last {name.lower()} output:\n{tail}")
     
-    def cleanup(self):
+    async def cleanup(self):
         """Clean up processes"""
         print("\n🛑 Shutting down services...")
         
         if self.backend_process:
-            self.backend_process.terminate()
-            try:
-                self.backend_process.wait(timeout=5)
-                print("✅ Backend stopped")
-            except subprocess.TimeoutExpired:
-                self.backend_process.kill()
-                print("⚠️ Backend force stopped")
+            await self._stop(self.backend_process, "Backend", BACKEND_LOG)
         
         if self.frontend_process:
-            self.frontend_process.terminate()
-            try:
-                self.frontend_process.wait(timeout=5)
-                print("✅ Frontend stopped")
-            except subprocess.TimeoutExpired:
-                self.frontend_process.kill()
-                print("⚠️ Frontend force stopped")
-    
-    def signal_handler(self, signum, frame):
-        """Handle shutdown signals"""
-        print(f"\n🛑 Received signal {signum}, shutting down...")
-        self.running = False
-        self.cleanup()
-        sys.exit(0)
+            await self._stop(self.frontend_process, "Frontend", FRONTEND_LOG)
+        
+        # Let the pumps flush the last output; grandchildren (e.g. under npm) may hold the pipe open
+        if self.pumps:
+            _, pending = await asyncio.wait(self.pumps, timeout=1)
+            for pump in pending:
+                pump.cancel()
+        
+        for log in (self.backend_log, self.frontend_log):
+            if log:
+                log.close()
     
-    def run(self):
+    async def run(self):
         """Main run function"""
         print("🎯 ATLAN CUSTOMER COPILOT - FULL SYSTEM STARTUP")
         print("=" * 60)
         
         # Set up signal handlers
-        signal.signal(signal.SIGINT, self.signal_handler)
-        signal.signal(signal.SIGTERM, self.signal_handler)
+        shutdown = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, shutdown.set)
+            except NotImplementedError:
+                # Windows event loops have no signal handlers; Ctrl+C raises KeyboardInterrupt instead
+                pass
         
         # Check if we're in the right directory
         if not Path("main.py").exists():
@@ -128,14 +216,15 @@ class SystemStarter:
             return False
         
         # Start backend
-        if not self.start_backend():
+        if not await self.start_backend():
             print("❌ Failed to start backend. Exiting.")
+            await self.cleanup()
             return False
         
         # Start frontend
-        if not self.start_frontend():
+        if not await self.start_frontend():
             print("❌ Failed to start frontend. Stopping backend.")
-            self.cleanup()
+            await self.cleanup()
             return False
         
         # Success message
@@ -154,32 +243,34 @@ class SystemStarter:
         print("\n💡 Press Ctrl+C to stop all services")
         print("=" * 60)
         
-        # Monitor services
+        # Monitor services - wake only when a service exits or a shutdown signal arrives
+        backend_exit = asyncio.create_task(self.backend_process.wait())
+        frontend_exit = asyncio.create_task(self.frontend_process.wait())
+        shutdown_requested = asyncio.create_task(shutdown.wait())
+        tasks = {backend_exit, frontend_exit, shutdown_requested}
         try:
-            while self.running:
-                backend_ok, frontend_ok = self.check_health()
-                
-                if not backend_ok:
-                    print("⚠️ Backend service stopped unexpectedly")
-                    break
-                
-                if not frontend_ok:
-                    print("⚠️ Frontend service stopped unexpectedly")
-                    break
-                
-                time.sleep(1)
-                
-        except KeyboardInterrupt:
-            pass
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            
+            if backend_exit in done:
+                print("⚠️ Backend service stopped unexpectedly")
+            elif frontend_exit in done:
+                print("⚠️ Frontend service stopped unexpectedly")
+            else:
+                print("\n🛑 Received shutdown signal, shutting down...")
         finally:
-            self.cleanup()
+            for task in tasks:
+                task.cancel()
+            await self.cleanup()
         
         return True
 
 def main():
     """Main function"""
     starter = SystemStarter()
-    success = starter.run()
+    try:
+        success = asyncio.run(starter.run())
+    except KeyboardInterrupt:
+        success = True
     
     if success:
         print("✅ System shutdown complete")
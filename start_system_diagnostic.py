@@ -7,28 +7,112 @@ Comprehensive check of frontend and backend readiness
 import os
 import sys
 import subprocess
+import shutil
+import tempfile
 import asyncio
-import json
+import importlib
+import importlib.util
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# (pip package name, import name)
+REQUIRED_PACKAGES = (
+    ('fastapi', 'fastapi'),
+    ('uvicorn', 'uvicorn'),
+    ('anthropic', 'anthropic'),
+    ('chromadb', 'chromadb'),
+    ('tavily-python', 'tavily'),
+    ('aiohttp', 'aiohttp'),
+    ('beautifulsoup4', 'bs4'),
+    ('python-dotenv', 'dotenv')
+)
+
+# (module, attribute) imported by the backend functionality test
+BACKEND_COMPONENTS = (
+    ('ai_pipeline.hybrid_rag_system', 'HybridRAGSystem'),
+    ('ai_pipeline.tavily_rag_integration', 'TavilyRAGIntegration'),
+    ('ai_pipeline.enhanced_rag_system', 'EnhancedRAGSystem'),
+    ('ai_pipeline.sentiment_agent', 'SentimentAgent')
+)
+
+REQUIRED_ENV_VARS = ('CLAUDE_API_KEY', 'TAVILY_API_KEY')
+
+REQUIRED_FILES = (
+    "main.py",
+    "requirements.txt",
+    ".env",
+    "client/package.json",
+    "client/src/App.tsx",
+    "ai_pipeline/hybrid_rag_system.py",
+    "ai_pipeline/tavily_rag_integration.py"
+)
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """stdout proxy that sends each thread's prints to its own buffer while checks run concurrently"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    def capture(self, buffer):
+        self._local.buffer = buffer
+    
+    def write(self, text):
+        return (getattr(self._local, 'buffer', None) or self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+
+def _run_tier(tier, stdout):
+    """Run a list of dependent checks in order in the current thread, capturing each check's output"""
+    outcomes = []
+    for name, check_func, is_async in tier:
+        buffer = io.StringIO()
+        stdout.capture(buffer)
+        try:
+            result = asyncio.run(check_func()) if is_async else check_func()
+        except Exception as e:
+            print(f"❌ {name} failed with error: {e}")
+            result = False
+        finally:
+            stdout.capture(None)
+        outcomes.append((name, result, buffer.getvalue()))
+    return outcomes
+
+def _log_tail(path, lines=20):
+    """Return the last lines of a log file"""
+    try:
+        with open(path, 'r', errors='replace') as f:
+            return "".join(f.readlines()[-lines:])
+    except OSError:
+        return ""
+
 def run_command(command, description, cwd=None):
-    """Run a command and return success status"""
+    """Run a command (argv list, no shell) and return success status"""
     print(f"🔄 {description}...")
+    # Resolve the executable explicitly so e.g. npm.cmd is found on Windows without a shell
+    command = [shutil.which(command[0]) or command[0], *command[1:]]
+    # Stream output to a log file instead of buffering it in a pipe
+    log_path = Path(tempfile.gettempdir()) / f"{description.lower().replace(' ', '_')}.log"
     try:
-        result = subprocess.run(
-            command, 
-            shell=True, 
-            check=True, 
-            capture_output=True, 
-            text=True,
-            cwd=cwd
-        )
+        with open(log_path, 'w') as log_file:
+            subprocess.run(
+                command, 
+                check=True, 
+                stdout=log_file, 
+                stderr=subprocess.STDOUT, 
+                text=True,
+                cwd=cwd
+            )
         print(f"✅ {description} completed successfully")
         return True
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, OSError) as e:
         print(f"❌ {description} failed: {e}")
-        if e.stderr:
-            print(f"Error: {e.stderr}")
+        tail = _log_tail(log_path)
+        if tail:
+            print(f"Error (see {log_path}):\n{tail}")
         return False
 
 def check_python_environment():
@@ -57,23 +141,15 @@ def check_backend_dependencies():
     print("\n🔧 Checking Backend Dependencies")
     print("-" * 40)
     
-    required_packages = [
-        ('fastapi', 'fastapi'),
-        ('uvicorn', 'uvicorn'),
-        ('anthropic', 'anthropic'),
-        ('chromadb', 'chromadb'),
-        ('tavily-python', 'tavily'),
-        ('aiohttp', 'aiohttp'),
-        ('beautifulsoup4', 'bs4'),
-        ('python-dotenv', 'dotenv')
-    ]
+    # find_spec only locates each package without executing its __init__, and is safe to run in parallel
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        found = list(executor.map(lambda package: importlib.util.find_spec(package[1]) is not None, REQUIRED_PACKAGES))
     
     missing_packages = []
-    for package_name, import_name in required_packages:
-        try:
-            __import__(import_name)
+    for (package_name, _), is_installed in zip(REQUIRED_PACKAGES, found):
+        if is_installed:
             print(f"✅ {package_name}")
-        except ImportError:
+        else:
             print(f"❌ {package_name}")
             missing_packages.append(package_name)
     
@@ -91,10 +167,9 @@ def check_environment_variables():
     from dotenv import load_dotenv
     load_dotenv()
     
-    required_vars = ['CLAUDE_API_KEY', 'TAVILY_API_KEY']
     missing_vars = []
     
-    for var in required_vars:
+    for var in REQUIRED_ENV_VARS:
         value = os.getenv(var)
         if value and value != f"your_{var.lower()}_here":
             print(f"✅ {var}")
@@ -108,66 +183,70 @@ def check_environment_variables():
     
     return True
 
-def check_backend_imports():
-    """Check backend imports"""
-    print("\n📦 Checking Backend Imports")
+def _cached_import(module_path: str, attr: str):
+    """Return module_path.attr, skipping the import machinery if the module is already loaded"""
+    module = sys.modules.get(module_path)
+    if module is None or getattr(module, "__spec__", None) is None:
+        module = importlib.import_module(module_path)
+    return getattr(module, attr)
+
+async def test_backend_functionality():
+    """Test backend imports and functionality"""
+    print("\n🧪 Testing Backend Functionality")
     print("-" * 40)
     
     try:
-        # Add ai_pipeline to path
-        sys.path.append('ai_pipeline')
-        
-        from hybrid_rag_system import HybridRAGSystem
-        print("✅ HybridRAGSystem")
-        
-        from tavily_rag_integration import TavilyRAGIntegration
-        print("✅ TavilyRAGIntegration")
-        
-        from enhanced_rag_system import EnhancedRAGSystem
-        print("✅ EnhancedRAGSystem")
+        # The components are independent, so import them concurrently -
+        # distinct modules load in parallel under the per-module import locks
+        with ThreadPoolExecutor(max_workers=len(BACKEND_COMPONENTS)) as executor:
+            futures = [executor.submit(_cached_import, *target) for target in BACKEND_COMPONENTS]
         
-        from sentiment_agent import SentimentAgent
-        print("✅ SentimentAgent")
+        # Report every component in table order, so one failure doesn't hide the rest
+        components = []
+        for (_, attr), future in zip(BACKEND_COMPONENTS, futures):
+            try:
+                components.append(future.result())
+                print(f"✅ {attr}")
+            except Exception as e:
+                components.append(None)
+                print(f"❌ {attr}: {e}")
+        if None in components:
+            return False
+        HybridRAGSystem = components[0]
         
         import main
         print("✅ Main application")
         
-        return True
-    except Exception as e:
-        print(f"❌ Import error: {e}")
-        return False
-
-async def test_backend_functionality():
-    """Test backend functionality"""
-    print("\n🧪 Testing Backend Functionality")
-    print("-" * 40)
-    
-    try:
-        from hybrid_rag_system import HybridRAGSystem
-        
         # Initialize system
         rag = HybridRAGSystem()
         print("✅ Hybrid RAG System initialized")
         
-        # Test Tavily topic
-        result1 = await rag.process_ticket_hybrid(
-            "How do I connect to Snowflake?",
-            ["How-to"],
-            "neutral",
-            "medium"
+        # Test Tavily and routed topics concurrently - the two tickets are independent
+        result1, result2 = await asyncio.gather(
+            rag.process_ticket_hybrid(
+                "How do I connect to Snowflake?",
+                ["How-to"],
+                "neutral",
+                "medium"
+            ),
+            rag.process_ticket_hybrid(
+                "I need help with data governance",
+                ["Glossary"],
+                "confused",
+                "medium"
+            ),
+            return_exceptions=True
         )
-        print(f"✅ Tavily topic test: {result1.search_type}")
         
-        # Test routed topic
-        result2 = await rag.process_ticket_hybrid(
-            "I need help with data governance",
-            ["Glossary"],
-            "confused",
-            "medium"
-        )
-        print(f"✅ Routed topic test: {result2.search_type}")
+        failed = False
+        for label, result in (("Tavily topic test", result1), ("Routed topic test", result2)):
+            if isinstance(result, Exception):
+                print(f"❌ {label}: {result}")
+                failed = True
+            else:
+                print(f"✅ {label}: {result.search_type}")
         
-        return True
+        return not failed
     except Exception as e:
         print(f"❌ Backend test error: {e}")
         return False
@@ -211,7 +290,7 @@ def test_frontend_build():
         return False
     
     # Try to build
-    success = run_command("npm run build", "Frontend build", cwd=client_dir)
+    success = run_command(["npm", "run", "build"], "Frontend build", cwd=client_dir)
     
     if success:
         # Check if build directory exists
@@ -230,18 +309,8 @@ def check_file_structure():
     print("\n📁 Checking File Structure")
     print("-" * 40)
     
-    required_files = [
-        "main.py",
-        "requirements.txt",
-        ".env",
-        "client/package.json",
-        "client/src/App.tsx",
-        "ai_pipeline/hybrid_rag_system.py",
-        "ai_pipeline/tavily_rag_integration.py"
-    ]
-    
     missing_files = []
-    for file_path in required_files:
+    for file_path in REQUIRED_FILES:
         if Path(file_path).exists():
             print(f"✅ {file_path}")
         else:
@@ -259,29 +328,47 @@ async def main():
     print("🔍 ATLAN CUSTOMER COPILOT - SYSTEM DIAGNOSTIC")
     print("=" * 60)
     
+    # (name, check function, is_async)
     checks = [
-        ("Python Environment", check_python_environment),
-        ("Backend Dependencies", check_backend_dependencies),
-        ("Environment Variables", check_environment_variables),
-        ("Backend Imports", check_backend_imports),
-        ("Backend Functionality", test_backend_functionality),
-        ("Frontend Dependencies", check_frontend_dependencies),
-        ("Frontend Build", test_frontend_build),
-        ("File Structure", check_file_structure)
+        ("Python Environment", check_python_environment, False),
+        ("Backend Dependencies", check_backend_dependencies, False),
+        ("Environment Variables", check_environment_variables, False),
+        ("Backend Functionality", test_backend_functionality, True),
+        ("Frontend Dependencies", check_frontend_dependencies, False),
+        ("Frontend Build", test_frontend_build, False),
+        ("File Structure", check_file_structure, False)
     ]
     
-    results = []
+    # Independent checks run concurrently; the backend checks form a chain
+    # (packages -> functionality) and run in order within one tier
+    check_funcs = {name: (check_func, is_async) for name, check_func, is_async in checks}
+    tiers = [
+        ["Python Environment"],
+        ["Environment Variables"],
+        ["File Structure"],
+        ["Frontend Dependencies"],
+        ["Backend Dependencies", "Backend Functionality"],
+        ["Frontend Build"]
+    ]
     
-    for name, check_func in checks:
-        try:
-            if asyncio.iscoroutinefunction(check_func):
-                result = await check_func()
-            else:
-                result = check_func()
-            results.append((name, result))
-        except Exception as e:
-            print(f"❌ {name} failed with error: {e}")
-            results.append((name, False))
+    loop = asyncio.get_running_loop()
+    original_stdout = sys.stdout
+    stdout = sys.stdout = _ThreadLocalStdout(original_stdout)
+    try:
+        tier_outcomes = await asyncio.gather(*(
+            loop.run_in_executor(None, _run_tier, [(name, *check_funcs[name]) for name in tier], stdout)
+            for tier in tiers
+        ))
+    finally:
+        sys.stdout = original_stdout
+    
+    # Print captured output in the original check order
+    outcomes = {name: (result, output) for tier in tier_outcomes for name, result, output in tier}
+    results = []
+    for name, _, _ in checks:
+        result, output = outcomes[name]
+        print(output, end="")
+        results.append((name, result))
     
     # Summary
     print("\n" + "=" * 60)
@@ -6,18 +6,33 @@ Interactive AI Agent with Real-time Documentation Search
 
 import streamlit as st
 import asyncio
-import json
-import sys
+import orjson
 import os
+import threading
+import hashlib
+import gzip
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple, TYPE_CHECKING
+from collections import Counter
+from cachetools import TTLCache
 
-# Add ai_pipeline to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'ai_pipeline'))
+# Import our AI pipeline components - the heavy ones (LLM/search clients,
+# PDF/DOCX parsers) are imported on first use so the page paints first
+from ai_pipeline.semantic_cache import SemanticCache
+from tavily_config import PERFORMANCE_CONFIG
+from dotenv import load_dotenv
 
-# Import our AI pipeline components
-from simple_tavily_system import get_simple_tavily_system
-from file_parser import file_parser
+if TYPE_CHECKING:
+    import pandas as pd
+
+load_dotenv()
+
+# Use libuv's event loop for the Tavily/Groq I/O when available. Loops are created
+# explicitly - installing a policy would swap Streamlit's own on every rerun.
+try:
+    from uvloop import new_event_loop as _new_event_loop
+except ImportError:
+    from asyncio import new_event_loop as _new_event_loop
 
 # Configure Streamlit page
 st.set_page_config(
@@ -82,34 +97,160 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Number of chat history entries rendered on each rerun
+DISPLAY_WINDOW = 20
+
 # Initialize session state
 if 'simple_tavily_system' not in st.session_state:
     st.session_state.simple_tavily_system = None
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
+if 'history_json_parts' not in st.session_state:
+    # One serialized record per chat entry, built once when the entry is added
+    st.session_state.history_json_parts = []
 if 'uploaded_files' not in st.session_state:
     st.session_state.uploaded_files = []
+if 'recent_queries' not in st.session_state:
+    # Per-session exact-match results - catches double submits and rerun replays
+    st.session_state.recent_queries = TTLCache(maxsize=256, ttl=PERFORMANCE_CONFIG['cache_duration'])
+
+def _new_agg():
+    """Empty running aggregates for the analytics tab"""
+    return {
+        'sentiment': Counter(),
+        'topic': Counter(),
+        'priority': Counter(),
+        'conf_sum': 0.0,
+        'tavily_used': 0,
+        'n': 0
+    }
+
+def _update_agg(result):
+    """Fold a new chat result into the running analytics aggregates"""
+    agg = st.session_state.agg
+    analysis = result['analysis']
+    agg['sentiment'][analysis.sentiment] += 1
+    agg['topic'].update(analysis.topic_tags)
+    agg['priority'][analysis.priority] += 1
+    agg['conf_sum'] += analysis.confidence
+    agg['tavily_used'] += int(result['response'].is_tavily_used)
+    agg['n'] += 1
+
+def _history_record_json(result) -> str:
+    """Serialize one chat result for the history download"""
+    # orjson serializes the analysis/response dataclasses natively
+    return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
+
+def _record_chat(result):
+    """
+    Add a chat result to the session history.
+    Rows stay in chat_history for display; the fields analytics reads are folded
+    into the running aggregates here, so nothing rescans the rows per rerun.
+    """
+    st.session_state.chat_history.append(result)
+    st.session_state.history_json_parts.append(_history_record_json(result))
+    st.session_state.pop('history_gz', None)
+    _update_agg(result)
+
+# Resolved once per process - later reruns and sessions reuse the cached objects
+@st.cache_resource(show_spinner=False)
+def _pipeline():
+    """The AI pipeline module, imported on first use"""
+    from ai_pipeline import simple_tavily_system
+    return simple_tavily_system
+
+@st.cache_resource(show_spinner=False)
+def _get_parser():
+    """The shared file parser, imported on first use"""
+    from ai_pipeline.file_parser import file_parser
+    return file_parser
+
+def _chart_frames(agg) -> Dict[str, "pd.DataFrame"]:
+    """Analytics chart DataFrames, rebuilt only after a new query has been aggregated"""
+    cached = agg.get('frames')
+    if cached is None or cached[0] != agg['n']:
+        import pandas as pd
+        frames = {
+            name: pd.DataFrame({'count': list(agg[name].values())}, index=list(agg[name].keys()))
+            for name in ('sentiment', 'topic', 'priority')
+        }
+        agg['frames'] = cached = (agg['n'], frames)
+    return cached[1]
+
+if 'agg' not in st.session_state:
+    st.session_state.agg = _new_agg()
+
+def check_api_keys():
+    """Check that both API keys are set, reading the environment once per session"""
+    if 'api_keys' not in st.session_state:
+        st.session_state.api_keys = (os.getenv("GROK_API_KEY"), os.getenv("TAVILY_API_KEY"))
+    return all(st.session_state.api_keys)
+
+# Pick the UI path at runtime: the full app needs both API keys
+MODE = "full" if check_api_keys() else "setup"
+
+@st.cache_resource(show_spinner=False)
+def _event_loop():
+    """Process-wide event loop running on a background thread"""
+    # The AI system is shared by every session and its pooled HTTP session is
+    # bound to one loop, so all of the app's async work runs on this loop
+    loop = _new_event_loop()
+    threading.Thread(target=loop.run_forever, name="copilot-event-loop", daemon=True).start()
+    return loop
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop()).result()
+
+def iterate_async(agen):
+    """Iterate an async generator on the shared loop, yielding items to the script thread"""
+    while True:
+        try:
+            yield run_async(agen.__anext__())
+        except StopAsyncIteration:
+            return
 
 @st.cache_resource
-async def initialize_system():
-    """Initialize the AI system with caching"""
+def initialize_system():
+    """Initialize the AI system once per process and cache the resolved instance"""
     try:
-        system = await get_simple_tavily_system()
-        return system
+        return run_async(_pipeline().get_simple_tavily_system())
     except Exception as e:
         st.error(f"Failed to initialize AI system: {str(e)}")
         return None
 
+@st.cache_resource
+def get_semantic_cache():
+    """Shared cache of query results, reused across sessions"""
+    return SemanticCache(ttl=PERFORMANCE_CONFIG['cache_duration'])
+
+# Chat entries never change once added, so their markdown is built once per
+# distinct analysis/response and each block renders as a single element
+@st.cache_data(show_spinner=False, max_entries=1024)
+def _analysis_markdown(topic_tags: Tuple[str, ...], reasoning: str) -> Tuple[str, str]:
+    """Markdown for the topic tags and reasoning blocks of an analysis card"""
+    tags_md = "**Topic Tags:**  \n" + "  \n".join(f"• {tag}" for tag in topic_tags)
+    reasoning_md = f"**Reasoning:**\n\n{reasoning}"
+    return tags_md, reasoning_md
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def _sources_markdown(sources: Tuple[Tuple[str, str, str], ...]) -> List[Tuple[str, str]]:
+    """Expander label and body markdown for each (title, url, snippet) source"""
+    return [
+        (f"Source {i}: {title[:50]}...", f"**URL:** {url}\n\n**Snippet:** {snippet}")
+        for i, (title, url, snippet) in enumerate(sources, 1)
+    ]
+
 def display_analysis(analysis):
     """Display the internal analysis in a formatted way"""
+    tags_md, reasoning_md = _analysis_markdown(tuple(analysis.topic_tags), analysis.reasoning)
+    
     with st.expander("🔍 Internal Analysis", expanded=True):
         col1, col2, col3 = st.columns(3)
         
         with col1:
             st.metric("Sentiment", analysis.sentiment, delta=None)
-            st.write("**Topic Tags:**")
-            for tag in analysis.topic_tags:
-                st.write(f"• {tag}")
+            st.markdown(tags_md)
         
         with col2:
             st.metric("Priority", analysis.priority, delta=None)
@@ -117,11 +258,13 @@ def display_analysis(analysis):
             st.metric("Confidence", f"{confidence_percentage}%")
         
         with col3:
-            st.write("**Reasoning:**")
-            st.write(analysis.reasoning)
+            st.markdown(reasoning_md)
 
-def display_response(response):
+def display_response(response, from_cache: bool = False):
     """Display the final response"""
+    if from_cache:
+        st.caption("⚡ Served from cache")
+    
     if response.is_tavily_used:
         st.success("🎯 **AI Response Generated**")
         st.markdown("---")
@@ -130,45 +273,82 @@ def display_response(response):
         if response.sources:
             st.markdown("---")
             st.write("**📚 Sources:**")
-            for i, source in enumerate(response.sources, 1):
-                with st.expander(f"Source {i}: {source['title'][:50]}..."):
-                    st.write(f"**URL:** {source['url']}")
-                    st.write(f"**Snippet:** {source['snippet']}")
+            sources = tuple((source['title'], source['url'], source['snippet']) for source in response.sources)
+            for label, body in _sources_markdown(sources):
+                with st.expander(label):
+                    st.markdown(body)
     else:
         st.info("📋 **Routed to Team**")
         st.markdown("---")
         st.write(response.routing_message)
 
-async def process_query(query: str):
+def display_chat(chat, number):
+    """Display a chat history entry"""
+    with st.expander(f"Query {number}: {chat['query'][:50]}... ({chat['timestamp']})"):
+        st.write(f"**Original Query:** {chat['query']}")
+        display_analysis(chat['analysis'])
+        display_response(chat['response'], chat.get('from_cache', False))
+
+def process_query(query: str):
     """Process a user query through the AI system"""
     if not st.session_state.simple_tavily_system:
         st.error("AI system not initialized. Please refresh the page.")
         return None
     
     try:
+        # Exact repeats in this session are answered straight from session state
+        recent = st.session_state.recent_queries
+        key = hashlib.sha1(query.strip().lower().encode()).hexdigest()
+        
+        # Then repeated or near-identical queries from any session skip the LLM and Tavily calls entirely
+        cache = get_semantic_cache()
+        cached = recent.get(key) or cache.lookup(query)
+        if cached:
+            analysis, response = cached
+            recent[key] = cached
+            return {
+                'analysis': analysis,
+                'response': response,
+                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'query': query,
+                'from_cache': True
+            }
+        
         # Show processing steps
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        # Step 1: Analysis
-        status_text.text("🧠 Analyzing query...")
+        # Step 1-2: Analysis and processing share a single classification pass
+        status_text.text("🧠 Analyzing and processing query...")
         progress_bar.progress(25)
         
-        analysis = await st.session_state.simple_tavily_system.analyze_ticket(query)
-        
-        # Step 2: Processing
-        status_text.text("🔍 Processing with AI system...")
-        progress_bar.progress(50)
-        
-        response = await st.session_state.simple_tavily_system.process_ticket(query)
+        # Show the answer as it streams in; the final item carries the analysis and sources
+        answer_placeholder = st.empty()
+        chunks = []
+        # Streamlit calls stay on the script thread; only the pipeline runs on the shared loop
+        for item in iterate_async(st.session_state.simple_tavily_system.process_ticket_stream(query)):
+            if isinstance(item, str):
+                if not chunks:
+                    status_text.text("✍️ Generating answer...")
+                    progress_bar.progress(50)
+                chunks.append(item)
+                answer_placeholder.markdown("".join(chunks))
+            else:
+                analysis, response = item
         
         # Step 3: Complete
         status_text.text("✅ Complete!")
         progress_bar.progress(100)
         
-        # Clear progress indicators
+        # Clear progress indicators and the streamed draft - the caller renders the final response
         progress_bar.empty()
         status_text.empty()
+        answer_placeholder.empty()
+        
+        # Like the disk cache, keep failed answers out so the next ask retries
+        if response.confidence > 0:
+            cache.store(query, (analysis, response))
+            recent[key] = (analysis, response)
         
         return {
             'analysis': analysis,
@@ -181,39 +361,82 @@ async def process_query(query: str):
         st.error(f"Error processing query: {str(e)}")
         return None
 
+def _parse_uploaded_file(file_parser, uploaded_file) -> Dict[str, Any]:
+    """Parse one uploaded file and extract its tickets (runs in a worker thread)"""
+    # UploadedFile is already an in-memory stream - parse it in place instead of copying it out
+    uploaded_file.seek(0)
+    parse_result = file_parser.parse_file(uploaded_file.name, uploaded_file)
+    if parse_result['success']:
+        tickets = file_parser.extract_tickets_from_content(parse_result['content'])
+        for ticket in tickets:
+            ticket['source_file'] = uploaded_file.name
+        parse_result['tickets'] = tickets
+    return parse_result
+
+async def _parse_uploaded_files(file_parser, uploaded_files) -> List[Any]:
+    """Parse uploaded files concurrently, returning each file's result or exception"""
+    # Cap concurrent parses so large batches don't thrash the thread pool
+    sem = asyncio.Semaphore(PERFORMANCE_CONFIG['max_concurrent_searches'])
+    
+    async def _parse_one(uploaded_file):
+        async with sem:
+            return await asyncio.to_thread(_parse_uploaded_file, file_parser, uploaded_file)
+    
+    return await asyncio.gather(*[_parse_one(f) for f in uploaded_files], return_exceptions=True)
+
 def process_uploaded_files(uploaded_files):
-    """Process uploaded files and extract tickets"""
+    """Process uploaded files concurrently and extract tickets"""
     if not uploaded_files:
         return []
     
+    # Import the parser here, not from the worker threads
+    file_parser = _get_parser()
+    results = run_async(_parse_uploaded_files(file_parser, uploaded_files))
+    
+    # Report in upload order from the script thread - Streamlit calls are not thread-safe.
+    # One success and one error block per batch rather than one element per file.
     all_tickets = []
+    processed, failed = [], []
+    for uploaded_file, result in zip(uploaded_files, results):
+        if isinstance(result, Exception):
+            failed.append(f"❌ Error processing {uploaded_file.name}: {str(result)}")
+        elif result['success']:
+            all_tickets.extend(result['tickets'])
+            processed.append(f"✅ Processed {uploaded_file.name}: Found {len(result['tickets'])} tickets")
+        else:
+            failed.append(f"❌ Failed to parse {uploaded_file.name}: {result['error']}")
     
-    for uploaded_file in uploaded_files:
-        try:
-            # Read file content
-            file_content = uploaded_file.read()
-            
-            # Parse the file
-            parse_result = file_parser.parse_file(uploaded_file.name, file_content)
-            
-            if parse_result['success']:
-                # Extract tickets from the parsed content
-                tickets = file_parser.extract_tickets_from_content(parse_result['content'])
-                
-                for ticket in tickets:
-                    ticket['source_file'] = uploaded_file.name
-                
-                all_tickets.extend(tickets)
-                st.success(f"✅ Processed {uploaded_file.name}: Found {len(tickets)} tickets")
-            else:
-                st.error(f"❌ Failed to parse {uploaded_file.name}: {parse_result['error']}")
-                
-        except Exception as e:
-            st.error(f"❌ Error processing {uploaded_file.name}: {str(e)}")
+    if processed:
+        st.success("\n\n".join(processed))
+    if failed:
+        st.error("\n\n".join(failed))
     
     return all_tickets
 
-async def main():
+def render_setup():
+    """Show setup instructions when the API keys are not configured"""
+    st.markdown('<h1 class="main-header">🤖 Atlan Customer Copilot</h1>', unsafe_allow_html=True)
+    st.markdown('<p class="sub-header">Interactive AI Agent with Real-time Documentation Search</p>', unsafe_allow_html=True)
+    
+    st.warning("⚠️ API keys not configured - AI features are disabled")
+    st.markdown("""
+**To enable the AI agent**, set the following environment variables (or add them to `.env`) and restart the app:
+
+- `GROK_API_KEY` - ticket classification and answer generation
+- `TAVILY_API_KEY` - real-time documentation search
+""")
+    
+    grok_key, tavily_key = st.session_state.api_keys
+    st.write("**Configured:**")
+    st.write(f"• GROK_API_KEY: {'✅' if grok_key else '❌'}")
+    st.write(f"• TAVILY_API_KEY: {'✅' if tavily_key else '❌'}")
+    
+    if st.button("🔄 Reload secrets"):
+        load_dotenv(override=True)
+        del st.session_state.api_keys
+        st.rerun()
+
+def main():
     """Main Streamlit application"""
     
     # Header
@@ -223,7 +446,7 @@ async def main():
     # Initialize the AI system
     if st.session_state.simple_tavily_system is None:
         with st.spinner("🚀 Initializing AI system..."):
-            st.session_state.simple_tavily_system = await initialize_system()
+            st.session_state.simple_tavily_system = initialize_system()
     
     if st.session_state.simple_tavily_system is None:
         st.error("❌ Failed to initialize the AI system. Please check your environment variables.")
@@ -235,28 +458,55 @@ async def main():
         
         # System stats
         st.subheader("📊 System Status")
-        stats = await st.session_state.simple_tavily_system.get_system_stats()
+        # Plain attribute read - no need to queue behind other sessions on the shared loop
+        ready = st.session_state.simple_tavily_system.initialized
         
         col1, col2 = st.columns(2)
         with col1:
             st.metric("System Type", "Tavily")
         with col2:
-            st.metric("Status", "✅ Ready" if stats['initialized'] else "❌ Not Ready")
+            st.metric("Status", "✅ Ready" if ready else "❌ Not Ready")
         
         # Clear chat history
         if st.button("🗑️ Clear Chat History"):
             st.session_state.chat_history = []
+            st.session_state.history_json_parts = []
+            st.session_state.pop('history_gz', None)
+            st.session_state.agg = _new_agg()
             st.rerun()
         
+        # Clear cached answers (disk, semantic, this session) and Tavily search results
+        if st.button("🧹 Clear Caches"):
+            _pipeline().get_query_cache().clear()
+            get_semantic_cache().clear()
+            st.session_state.recent_queries.clear()
+            if st.session_state.simple_tavily_system.tavily_rag:
+                st.session_state.simple_tavily_system.tavily_rag.clear_search_cache()
+            st.success("✅ Caches cleared")
+        
         # Export chat history
         if st.session_state.chat_history:
-            chat_json = json.dumps(st.session_state.chat_history, indent=2)
-            st.download_button(
-                label="📥 Download Chat History",
-                data=chat_json,
-                file_name=f"atlan_copilot_chat_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json"
-            )
+            # Records were serialized as they were added - only the join happens per rerun
+            chat_json = "[\n" + ",\n".join(st.session_state.history_json_parts) + "\n]"
+            file_name = f"atlan_copilot_chat_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            
+            if st.checkbox("🗜️ Compressed (.json.gz)", value=True):
+                # Compress once per history change, not on every rerun
+                if 'history_gz' not in st.session_state:
+                    st.session_state.history_gz = gzip.compress(chat_json.encode(), compresslevel=6)
+                st.download_button(
+                    label="📥 Download Chat History",
+                    data=st.session_state.history_gz,
+                    file_name=f"{file_name}.gz",
+                    mime="application/gzip"
+                )
+            else:
+                st.download_button(
+                    label="📥 Download Chat History",
+                    data=chat_json,
+                    file_name=file_name,
+                    mime="application/json"
+                )
     
     # Main content tabs
     tab1, tab2, tab3 = st.tabs(["💬 Interactive Chat", "📁 File Upload", "📊 Analytics"])
@@ -278,11 +528,11 @@ async def main():
         
         # Process query
         if send_button and user_input.strip():
-            result = await process_query(user_input.strip())
+            result = process_query(user_input.strip())
             
             if result:
                 # Add to chat history
-                st.session_state.chat_history.append(result)
+                _record_chat(result)
                 
                 # Display results
                 st.markdown("---")
@@ -291,7 +541,7 @@ async def main():
                 display_analysis(result['analysis'])
                 
                 # Display response
-                display_response(result['response'])
+                display_response(result['response'], result.get('from_cache', False))
                 
                 # Clear input
                 st.rerun()
@@ -301,11 +551,16 @@ async def main():
             st.markdown("---")
             st.subheader("📜 Chat History")
             
-            for i, chat in enumerate(reversed(st.session_state.chat_history)):
-                with st.expander(f"Query {len(st.session_state.chat_history) - i}: {chat['query'][:50]}... ({chat['timestamp']})"):
-                    st.write(f"**Original Query:** {chat['query']}")
-                    display_analysis(chat['analysis'])
-                    display_response(chat['response'])
+            # Only render the most recent queries; older ones are rendered on request
+            history = st.session_state.chat_history
+            total = len(history)
+            for i, chat in enumerate(reversed(history[-DISPLAY_WINDOW:])):
+                display_chat(chat, total - i)
+            
+            if total > DISPLAY_WINDOW:
+                if st.checkbox(f"Show {total - DISPLAY_WINDOW} earlier queries"):
+                    for i, chat in enumerate(reversed(history[:-DISPLAY_WINDOW])):
+                        display_chat(chat, total - DISPLAY_WINDOW - i)
     
     with tab2:
         st.header("📁 File Upload & Processing")
@@ -339,10 +594,10 @@ async def main():
                                 
                                 # Process ticket with AI
                                 if st.button(f"🤖 Analyze Ticket {i+1}", key=f"analyze_{i}"):
-                                    result = await process_query(ticket['body'])
+                                    result = process_query(ticket['body'])
                                     if result:
                                         display_analysis(result['analysis'])
-                                        display_response(result['response'])
+                                        display_response(result['response'], result.get('from_cache', False))
                     else:
                         st.warning("⚠️ No tickets found in uploaded files")
     
@@ -350,28 +605,10 @@ async def main():
         st.header("📊 Analytics & Insights")
         
         if st.session_state.chat_history:
-            # Calculate statistics
-            total_queries = len(st.session_state.chat_history)
-            
-            # Sentiment distribution
-            sentiment_counts = {}
-            topic_counts = {}
-            priority_counts = {}
-            
-            for chat in st.session_state.chat_history:
-                analysis = chat['analysis']
-                
-                # Count sentiments
-                sentiment = analysis.sentiment
-                sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-                
-                # Count topics
-                for topic in analysis.topic_tags:
-                    topic_counts[topic] = topic_counts.get(topic, 0) + 1
-                
-                # Count priorities
-                priority = analysis.priority
-                priority_counts[priority] = priority_counts.get(priority, 0) + 1
+            # Statistics come from running aggregates updated once per query
+            agg = st.session_state.agg
+            total_queries = agg['n']
+            frames = _chart_frames(agg)
             
             # Display metrics
             col1, col2, col3 = st.columns(3)
@@ -380,27 +617,26 @@ async def main():
                 st.metric("Total Queries", total_queries)
             
             with col2:
-                avg_confidence = sum(chat['analysis'].confidence for chat in st.session_state.chat_history) / total_queries
+                avg_confidence = agg['conf_sum'] / total_queries
                 st.metric("Avg Confidence", f"{round(avg_confidence * 100, 1)}%")
             
             with col3:
-                tavily_used = sum(1 for chat in st.session_state.chat_history if chat['response'].is_tavily_used)
-                st.metric("AI Responses", f"{tavily_used}/{total_queries}")
+                st.metric("AI Responses", f"{agg['tavily_used']}/{total_queries}")
             
             # Charts
             col1, col2 = st.columns(2)
             
             with col1:
                 st.subheader("📊 Sentiment Distribution")
-                st.bar_chart(sentiment_counts)
+                st.bar_chart(frames['sentiment'])
             
             with col2:
                 st.subheader("🏷️ Topic Distribution")
-                st.bar_chart(topic_counts)
+                st.bar_chart(frames['topic'])
             
             # Priority distribution
             st.subheader("⚡ Priority Distribution")
-            st.bar_chart(priority_counts)
+            st.bar_chart(frames['priority'])
             
             # Recent queries
             st.subheader("🕒 Recent Queries")
@@ -420,4 +656,7 @@ async def main():
     )
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if MODE == "full":
+        main()
+    else:
+        render_setup()
@@ -4,6 +4,10 @@ Tavily Configuration for Atlan Customer Copilot
 Configuration settings for Tavily API integration
 """
 
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
 # Tavily API Configuration
 TAVILY_CONFIG = {
     "api_key": None,  # Set via environment variable TAVILY_API_KEY
@@ -142,3 +146,61 @@ LOGGING_CONFIG = {
     "log_errors": True,
     "log_level": "INFO"
 }
+
+# Freeze Configuration
+# Config is read-only: dicts become MappingProxyType and lists become tuples,
+# so nothing can mutate it at runtime and values are hashable for lru_cache.
+def _freeze(value):
+    """Recursively convert dicts and lists into read-only equivalents"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+TAVILY_CONFIG = _freeze(TAVILY_CONFIG)
+DOCS_SITES = _freeze(DOCS_SITES)
+SEARCH_PARAMETERS = _freeze(SEARCH_PARAMETERS)
+QUERY_CLASSIFICATION = _freeze(QUERY_CLASSIFICATION)
+CONFIDENCE_THRESHOLDS = _freeze(CONFIDENCE_THRESHOLDS)
+PERFORMANCE_CONFIG = _freeze(PERFORMANCE_CONFIG)
+CONTENT_FILTERS = _freeze(CONTENT_FILTERS)
+RESPONSE_TEMPLATES = _freeze(RESPONSE_TEMPLATES)
+LOGGING_CONFIG = _freeze(LOGGING_CONFIG)
+
+@lru_cache(maxsize=None)
+def build_search_payload(site_name: str, query_type: str = "general") -> MappingProxyType:
+    """
+    Tavily search parameters for a documentation site and query type.
+    Built once per combination; copy it and add the "query" before sending.
+    """
+    site = DOCS_SITES[site_name]
+    return MappingProxyType({
+        **SEARCH_PARAMETERS[query_type],
+        "include_domains": site["include_domains"],
+        "exclude_domains": site["exclude_domains"],
+    })
+
+# Keyword Matchers
+# The realtime keyword list is compiled once into a single alternation so a
+# query is scanned in one pass instead of once per keyword.
+
+def _compile_keywords(keywords):
+    """Compile a keyword list into one case-insensitive substring matcher"""
+    # Longest first so overlapping keywords prefer the most specific match
+    ordered = sorted({k.lower() for k in keywords}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered), re.IGNORECASE)
+
+_REALTIME_RE = _compile_keywords(QUERY_CLASSIFICATION["realtime_keywords"])
+
+def is_realtime(query: str) -> bool:
+    """True if the query mentions any time-sensitive keyword"""
+    return _REALTIME_RE.search(query) is not None
+
+# Compiled Content Filters
+COMPILED_EXCLUDE = tuple(re.compile(p) for p in CONTENT_FILTERS["exclude_patterns"])
+COMPILED_INCLUDE = tuple(re.compile(p) for p in CONTENT_FILTERS["include_patterns"])
+
+def url_allowed(url: str) -> bool:
+    """True if the URL matches an include pattern and no exclude pattern"""
+    return (not any(r.search(url) for r in COMPILED_EXCLUDE)) and any(r.search(url) for r in COMPILED_INCLUDE)